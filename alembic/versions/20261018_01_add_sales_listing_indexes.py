@@ -0,0 +1,41 @@
+"""add indexes backing the paginated /sales listing
+
+Revision ID: 20261018_01
+Revises: 20260222
+Create Date: 2026-10-18
+
+Composite indexes for keyset pagination on (created_at, id) and for the
+payment_status / delivery_status filters. Additive only.
+"""
+
+from alembic import op
+
+
+revision = "20261018_01"
+down_revision = "20260222"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_sales_created_at_id",
+        "sales",
+        ["created_at", "id"],
+    )
+    op.create_index(
+        "ix_sales_payment_status_created_at",
+        "sales",
+        ["payment_status", "created_at"],
+    )
+    op.create_index(
+        "ix_sales_delivery_status_created_at",
+        "sales",
+        ["delivery_status", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sales_delivery_status_created_at", table_name="sales")
+    op.drop_index("ix_sales_payment_status_created_at", table_name="sales")
+    op.drop_index("ix_sales_created_at_id", table_name="sales")
@@ -0,0 +1,36 @@
+"""add indexes backing the dashboard aggregation
+
+Revision ID: 20261018_02
+Revises: 20261018_01
+Create Date: 2026-10-18
+
+Range predicates on purchases.created_at and the lens status counts.
+sales.created_at is already covered by ix_sales_created_at_id.
+Additive only.
+"""
+
+from alembic import op
+
+
+revision = "20261018_02"
+down_revision = "20261018_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_purchases_created_at",
+        "purchases",
+        ["created_at"],
+    )
+    op.create_index(
+        "ix_lens_orders_status",
+        "lens_orders",
+        ["status"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lens_orders_status", table_name="lens_orders")
+    op.drop_index("ix_purchases_created_at", table_name="purchases")
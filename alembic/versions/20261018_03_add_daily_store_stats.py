@@ -0,0 +1,39 @@
+"""add daily_store_stats rollup table
+
+Revision ID: 20261018_03
+Revises: 20261018_02
+Create Date: 2026-10-18
+
+Per-day sales / collection / return / purchase totals maintained by the
+write paths. Populate existing history with
+`python -m app.services.daily_stats rebuild`.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_03"
+down_revision = "20261018_02"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_store_stats",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("sales_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sales_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("collected_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("delivered_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("returns_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("refund_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("purchase_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("purchase_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_store_stats")
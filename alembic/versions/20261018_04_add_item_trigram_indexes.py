@@ -0,0 +1,51 @@
+"""add pg_trgm GIN indexes for item search
+
+Revision ID: 20261018_04
+Revises: 20261018_03
+Create Date: 2026-10-18
+
+Backs the ILIKE '%q%' / 'q%' lookups in item search. Skipped when the
+server does not ship pg_trgm; run with ITEM_SEARCH_BACKEND=memory there.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_04"
+down_revision = "20261018_03"
+branch_labels = None
+depends_on = None
+
+
+SEARCH_COLUMNS = ("name", "brand", "model", "barcode")
+
+
+def _trgm_available() -> bool:
+    bind = op.get_bind()
+    return bool(
+        bind.execute(
+            sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        ).scalar()
+    )
+
+
+def upgrade() -> None:
+    if not _trgm_available():
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for col in SEARCH_COLUMNS:
+        op.create_index(
+            f"ix_items_{col}_trgm",
+            "items",
+            [col],
+            postgresql_using="gin",
+            postgresql_ops={col: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for col in SEARCH_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_items_{col}_trgm")
@@ -0,0 +1,33 @@
+"""add unique partial index on items.barcode
+
+Revision ID: 20261018_05
+Revises: 20261018_04
+Create Date: 2026-10-18
+
+Exact-match index for barcode scans. NULL and empty barcodes are excluded
+so items without a barcode are unaffected. Duplicate non-empty barcodes
+must be resolved before upgrading.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_05"
+down_revision = "20261018_04"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ux_items_barcode",
+        "items",
+        ["barcode"],
+        unique=True,
+        postgresql_where=sa.text("barcode IS NOT NULL AND barcode <> ''"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_items_barcode", table_name="items")
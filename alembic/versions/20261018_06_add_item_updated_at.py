@@ -0,0 +1,40 @@
+"""add updated_at to items for catalogue delta sync
+
+Revision ID: 20261018_06
+Revises: 20261018_05
+Create Date: 2026-10-18
+
+Existing rows start at the migration time, so the first delta sync after
+upgrading returns the whole catalogue once. Additive only.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_06"
+down_revision = "20261018_05"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "items",
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_items_updated_at_id", "items", ["updated_at", "id"])
+    op.create_index("ix_items_category_id", "items", ["category_id"])
+    op.create_index("ix_items_brand", "items", ["brand"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_items_brand", table_name="items")
+    op.drop_index("ix_items_category_id", table_name="items")
+    op.drop_index("ix_items_updated_at_id", table_name="items")
+    op.drop_column("items", "updated_at")
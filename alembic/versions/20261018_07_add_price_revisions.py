@@ -0,0 +1,61 @@
+"""add price_revisions audit tables
+
+Revision ID: 20261018_07
+Revises: 20261018_06
+Create Date: 2026-10-18
+
+Header and per-item before/after rows for bulk price and GST revisions.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_07"
+down_revision = "20261018_06"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_revisions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("filters", sa.JSON(), nullable=True),
+        sa.Column("rule", sa.JSON(), nullable=True),
+        sa.Column("affected_count", sa.Integer(), nullable=True),
+        sa.Column("note", sa.Text(), nullable=True),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_table(
+        "price_revision_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("revision_id", sa.Integer(), sa.ForeignKey("price_revisions.id"), nullable=True),
+        sa.Column("item_id", sa.Integer(), sa.ForeignKey("items.id"), nullable=True),
+        sa.Column("old_price", sa.Numeric(), nullable=True),
+        sa.Column("new_price", sa.Numeric(), nullable=True),
+        sa.Column("old_gst_percent", sa.Numeric(), nullable=True),
+        sa.Column("new_gst_percent", sa.Numeric(), nullable=True),
+    )
+    op.create_index(
+        "ix_price_revision_items_revision_id",
+        "price_revision_items",
+        ["revision_id"],
+    )
+    op.create_index(
+        "ix_price_revision_items_item_id",
+        "price_revision_items",
+        ["item_id"],
+    )
+    op.create_index("ix_items_hsn_code", "items", ["hsn_code"])
+    op.create_index("ix_items_supplier_name", "items", ["supplier_name"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_items_supplier_name", table_name="items")
+    op.drop_index("ix_items_hsn_code", table_name="items")
+    op.drop_index("ix_price_revision_items_item_id", table_name="price_revision_items")
+    op.drop_index("ix_price_revision_items_revision_id", table_name="price_revision_items")
+    op.drop_table("price_revision_items")
+    op.drop_table("price_revisions")
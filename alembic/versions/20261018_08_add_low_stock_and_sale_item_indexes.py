@@ -0,0 +1,36 @@
+"""add low-stock partial index and sale_items foreign key indexes
+
+Revision ID: 20261018_08
+Revises: 20261018_07
+Create Date: 2026-10-18
+
+ix_items_low_stock only holds rows with stock_qty <= reorder_level, so the
+low-stock list and dashboard count no longer scan items. The sale_items
+indexes back the sales-velocity join and sale detail loading.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_08"
+down_revision = "20261018_07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_items_low_stock",
+        "items",
+        ["id"],
+        postgresql_where=sa.text("stock_qty <= reorder_level"),
+    )
+    op.create_index("ix_sale_items_sale_id", "sale_items", ["sale_id"])
+    op.create_index("ix_sale_items_item_id", "sale_items", ["item_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sale_items_item_id", table_name="sale_items")
+    op.drop_index("ix_sale_items_sale_id", table_name="sale_items")
+    op.drop_index("ix_items_low_stock", table_name="items")
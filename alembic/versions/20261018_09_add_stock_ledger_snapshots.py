@@ -0,0 +1,61 @@
+"""add stock_snapshots and stock ledger indexes
+
+Revision ID: 20261018_09
+Revises: 20261018_08
+Create Date: 2026-10-18
+
+Per-item end-of-day balances so "stock as of date" reads one snapshot
+plus a short movement tail. Take snapshots with
+`python -m app.services.stock_ledger snapshot [--date YYYY-MM-DD]`.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_09"
+down_revision = "20261018_08"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_stock_movements_item_id_created_at",
+        "stock_movements",
+        ["item_id", "created_at"],
+    )
+    op.create_index(
+        "ix_stock_movements_created_at",
+        "stock_movements",
+        ["created_at"],
+    )
+
+    op.create_table(
+        "stock_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "item_id",
+            sa.Integer(),
+            sa.ForeignKey("items.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("snapshot_date", sa.Date(), nullable=False),
+        sa.Column("cutoff_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("qty", sa.Integer(), nullable=False),
+        sa.Column("cost_price", sa.Numeric(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+        sa.UniqueConstraint("item_id", "snapshot_date", name="uq_stock_snapshots_item_date"),
+    )
+    op.create_index(
+        "ix_stock_snapshots_snapshot_date",
+        "stock_snapshots",
+        ["snapshot_date"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_snapshots_snapshot_date", table_name="stock_snapshots")
+    op.drop_table("stock_snapshots")
+    op.drop_index("ix_stock_movements_created_at", table_name="stock_movements")
+    op.drop_index("ix_stock_movements_item_id_created_at", table_name="stock_movements")
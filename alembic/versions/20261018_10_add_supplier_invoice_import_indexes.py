@@ -0,0 +1,33 @@
+"""add indexes for supplier invoice import
+
+Revision ID: 20261018_10
+Revises: 20261018_09
+Create Date: 2026-10-18
+
+ix_purchases_supplier_id_invoice_no backs the (supplier_id, invoice_no)
+duplicate check; ix_items_model backs matching invoice lines by model.
+The pair is not made unique because existing data may already hold
+re-keyed bills; the importer de-duplicates instead.
+"""
+
+from alembic import op
+
+
+revision = "20261018_10"
+down_revision = "20261018_09"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_purchases_supplier_id_invoice_no",
+        "purchases",
+        ["supplier_id", "invoice_no"],
+    )
+    op.create_index("ix_items_model", "items", ["model"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_items_model", table_name="items")
+    op.drop_index("ix_purchases_supplier_id_invoice_no", table_name="purchases")
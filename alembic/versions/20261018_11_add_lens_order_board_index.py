@@ -0,0 +1,32 @@
+"""add (status, order_date) index for the lens order board
+
+Revision ID: 20261018_11
+Revises: 20261018_10
+Create Date: 2026-10-18
+
+Replaces ix_lens_orders_status: the composite index serves the same
+status lookups plus the board's status + date filtering and the
+(order_date, id) keyset pages.
+"""
+
+from alembic import op
+
+
+revision = "20261018_11"
+down_revision = "20261018_10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_lens_orders_status_order_date",
+        "lens_orders",
+        ["status", "order_date"],
+    )
+    op.drop_index("ix_lens_orders_status", table_name="lens_orders")
+
+
+def downgrade() -> None:
+    op.create_index("ix_lens_orders_status", "lens_orders", ["status"])
+    op.drop_index("ix_lens_orders_status_order_date", table_name="lens_orders")
@@ -0,0 +1,51 @@
+"""add open-order expected_date index and supplier_lens_stats
+
+Revision ID: 20261018_12
+Revises: 20261018_11
+Create Date: 2026-10-18
+
+ix_lens_orders_open_expected_date only covers orders that are not yet
+delivered, so the overdue / due-soon scan skips delivered history.
+supplier_lens_stats is refilled by the in-process scheduler.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_12"
+down_revision = "20261018_11"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_lens_orders_open_expected_date",
+        "lens_orders",
+        ["expected_date"],
+        postgresql_where=sa.text("status <> 'DELIVERED'"),
+    )
+
+    op.create_table(
+        "supplier_lens_stats",
+        sa.Column(
+            "supplier_id",
+            sa.Integer(),
+            sa.ForeignKey("suppliers.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("completed_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("avg_turnaround_days", sa.Numeric(8, 2), nullable=True),
+        sa.Column("p90_turnaround_days", sa.Numeric(8, 2), nullable=True),
+        sa.Column("on_time_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("late_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("open_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("overdue_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("computed_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("supplier_lens_stats")
+    op.drop_index("ix_lens_orders_open_expected_date", table_name="lens_orders")
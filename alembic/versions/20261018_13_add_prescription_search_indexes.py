@@ -0,0 +1,49 @@
+"""add prescription history and power-range search indexes
+
+Revision ID: 20261018_13
+Revises: 20261018_12
+Create Date: 2026-10-18
+
+Phone lookups resolve sale ids through ix_sales_customer_phone (and
+customers.phone via ix_sales_customer_id), then read prescriptions by
+sale_id. The sphere/cyl indexes serve recall searches per eye.
+"""
+
+from alembic import op
+
+
+revision = "20261018_13"
+down_revision = "20261018_12"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_sales_customer_phone", "sales", ["customer_phone"])
+    op.create_index("ix_sales_customer_id", "sales", ["customer_id"])
+
+    op.create_index("ix_prescriptions_sale_id", "prescriptions", ["sale_id"])
+    op.create_index(
+        "ix_prescriptions_created_at_id",
+        "prescriptions",
+        ["created_at", "id"],
+    )
+    op.create_index(
+        "ix_prescriptions_sphere_r_cyl_r",
+        "prescriptions",
+        ["sphere_r", "cyl_r"],
+    )
+    op.create_index(
+        "ix_prescriptions_sphere_l_cyl_l",
+        "prescriptions",
+        ["sphere_l", "cyl_l"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prescriptions_sphere_l_cyl_l", table_name="prescriptions")
+    op.drop_index("ix_prescriptions_sphere_r_cyl_r", table_name="prescriptions")
+    op.drop_index("ix_prescriptions_created_at_id", table_name="prescriptions")
+    op.drop_index("ix_prescriptions_sale_id", table_name="prescriptions")
+    op.drop_index("ix_sales_customer_id", table_name="sales")
+    op.drop_index("ix_sales_customer_phone", table_name="sales")
@@ -0,0 +1,31 @@
+"""add prescriptions.customer_id
+
+Revision ID: 20261018_14
+Revises: 20261018_13
+Create Date: 2026-10-18
+
+Imported historical prescriptions have no sale, so they are tied to the
+customer directly and still show up in the phone history lookup.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_14"
+down_revision = "20261018_13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "prescriptions",
+        sa.Column("customer_id", sa.Integer(), sa.ForeignKey("customers.id"), nullable=True),
+    )
+    op.create_index("ix_prescriptions_customer_id", "prescriptions", ["customer_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prescriptions_customer_id", table_name="prescriptions")
+    op.drop_column("prescriptions", "customer_id")
@@ -0,0 +1,27 @@
+"""stamp items.updated_at with clock_timestamp()
+
+Revision ID: 20261018_15
+Revises: 20261018_14
+Create Date: 2026-10-18
+
+now() is the transaction start time, so a row written late in a long
+transaction could carry a stamp older than a delta sync that ran before
+it committed. clock_timestamp() is the time of the write itself.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_15"
+down_revision = "20261018_14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column("items", "updated_at", server_default=sa.func.clock_timestamp())
+
+
+def downgrade() -> None:
+    op.alter_column("items", "updated_at", server_default=sa.func.now())
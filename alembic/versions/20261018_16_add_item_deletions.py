@@ -0,0 +1,37 @@
+"""add item_deletions tombstones for catalogue delta sync
+
+Revision ID: 20261018_16
+Revises: 20261018_15
+Create Date: 2026-10-18
+
+Deleted items leave no row for GET /items?updated_since= to return, so
+each delete records the id here and delta sync reports it. Additive only.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_16"
+down_revision = "20261018_15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "item_deletions",
+        sa.Column("item_id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "deleted_at",
+            sa.TIMESTAMP(),
+            server_default=sa.func.clock_timestamp(),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_item_deletions_deleted_at", "item_deletions", ["deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_deletions_deleted_at", table_name="item_deletions")
+    op.drop_table("item_deletions")
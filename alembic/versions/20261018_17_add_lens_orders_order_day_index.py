@@ -0,0 +1,30 @@
+"""index lens orders on their board paging key
+
+Revision ID: 20261018_17
+Revises: 20261018_16
+Create Date: 2026-10-18
+
+The lens board pages on (coalesce(order_date, created_at::date), id) so
+orders without an order_date still get a cursor. Additive only.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_17"
+down_revision = "20261018_16"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_lens_orders_order_day_id",
+        "lens_orders",
+        [sa.text("coalesce(order_date, (created_at)::date)"), "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lens_orders_order_day_id", table_name="lens_orders")
@@ -1,24 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
+from app.core.config import (
+    LOGIN_IP_BURST,
+    LOGIN_IP_REFILL_SECONDS,
+    LOGIN_USER_BURST,
+    LOGIN_USER_REFILL_SECONDS,
+)
+from app.core.ratelimit import TokenBucketLimiter
 from app.models.all_models import User
-from app.core.security import verify_password, create_access_token
+from app.core.security import PasswordHasherBusy, verify_password_async, create_access_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+user_attempts = TokenBucketLimiter(LOGIN_USER_BURST, LOGIN_USER_REFILL_SECONDS)
+ip_attempts = TokenBucketLimiter(LOGIN_IP_BURST, LOGIN_IP_REFILL_SECONDS)
+
+
+def _throttled(retry_after: float):
+    return HTTPException(
+        status_code=429,
+        detail="Too many login attempts, try again later",
+        headers={"Retry-After": str(int(retry_after) + 1)},
+    )
+
+
+def _find_user(db: Session, username: str):
+    return (
+        db.query(User.id, User.password_hash, User.is_active)
+        .filter(User.username == username)
+        .first()
+    )
+
 
 @router.post("/login")
-def login(username: str, password: str, db: Session = Depends(get_db)):
+async def login(
+        request: Request,
+        form: OAuth2PasswordRequestForm = Depends(),
+        db: Session = Depends(get_db)):
+    """
+    Credentials come as a form body (username, password). Attempts are
+    throttled per username and per client IP before any hashing, and
+    bcrypt runs on its own bounded pool rather than the request threads.
+    """
+    username = form.username.strip()
+    user_key = username.lower()
+    ip_key = request.client.host if request.client else "unknown"
+
+    for limiter, key in ((ip_attempts, ip_key), (user_attempts, user_key)):
+        wait = limiter.consume(key)
+        if wait:
+            raise _throttled(wait)
 
-    user = db.query(User).filter(User.username == username).first()
+    user = await run_in_threadpool(_find_user, db, username)
 
-    if not user:
+    if not user or user.is_active is False:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not verify_password(password, user.password_hash):
+    try:
+        ok = await verify_password_async(form.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Login is busy, try again",
+            headers={"Retry-After": "1"},
+        )
+
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    user_attempts.reset(user_key)
+
     token = create_access_token({"sub": str(user.id)})
 
     return {"access_token": token, "token_type": "bearer"}
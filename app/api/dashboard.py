@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends
+from datetime import date, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.api.security import get_current_user
 from app.crud.dashboard import get_dashboard
+from app.services.daily_stats import get_trend
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -13,3 +16,18 @@ def dashboard(
         db: Session = Depends(get_db),
         user=Depends(get_current_user)):
     return get_dashboard(db)
+
+
+@router.get("/trend")
+def dashboard_trend(
+        date_from: date | None = Query(None, alias="from"),
+        date_to: date | None = Query(None, alias="to"),
+        granularity: str = "day",
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=29)
+    try:
+        return get_trend(db, date_from, date_to, granularity)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
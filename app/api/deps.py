@@ -1,11 +1,15 @@
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import event
 
+from app.core.cache import LRUCache
+from app.core.config import AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL
 from app.core.security import SECRET_KEY, ALGORITHM
 from app.core.database import SessionLocal
-from app.models.all_models import User
+from app.models.all_models import Role, User
 
 
 # ================= DB DEP =================
@@ -21,27 +25,84 @@ def get_db():
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+@dataclass(frozen=True)
+class AuthUser:
+    """The authenticated principal handed to endpoints."""
+    id: int
+    username: str
+    role: str | None
+    is_active: bool
+
+
+# token subject (user id) -> AuthUser
+user_cache = LRUCache(maxsize=AUTH_USER_CACHE_SIZE, ttl=AUTH_USER_CACHE_TTL)
+
+
+def invalidate_user(user_id) -> None:
+    user_cache.pop(str(user_id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _forget_user(mapper, connection, target) -> None:
+    invalidate_user(target.id)
+
+
+def _unauthorized(detail: str):
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _load_user(subject: str):
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(User.id, User.username, User.is_active, Role.name.label("role"))
+            .outerjoin(Role, Role.id == User.role_id)
+            .filter(User.id == int(subject))
+            .first()
+        )
+    finally:
+        db.close()
+
+    if row is None:
+        return None
+    return AuthUser(
+        id=row.id,
+        username=row.username,
+        role=row.role,
+        # NULL is treated as active, matching the column default
+        is_active=row.is_active is not False,
+    )
+
+
+def resolve_user(token: str) -> AuthUser:
+    """
+    Verify the token and return its user. Only the JWT signature is
+    checked on a cache hit; misses load the user with a short-lived
+    session so no connection is held for the rest of the request.
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
+        subject = str(int(payload.get("sub")))
+    except Exception:
+        raise _unauthorized("Invalid token")
 
-        if user_id is None:
-            raise Exception()
+    user = user_cache.get(subject)
+    if user is None:
+        user = _load_user(subject)
+        if user is None:
+            raise _unauthorized("User not found")
+        user_cache.set(subject, user)
 
-        user = db.query(User).get(int(user_id))
+    if not user.is_active:
+        raise _unauthorized("Inactive user")
 
-        if not user:
-            raise Exception()
+    return user
 
-        return user
 
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+def get_current_user(token: str = Depends(oauth2_scheme)) -> AuthUser:
+    return resolve_user(token)
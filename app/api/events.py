@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.security import get_stream_user
+from app.services.events import sse_stream
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+@router.get("/stream")
+async def event_stream(
+    request: Request,
+    topics: str | None = None,
+    user=Depends(get_stream_user),
+):
+    """
+    Server-Sent Events feed of sale, purchase, stock and lens changes.
+    `topics` is a comma separated subset of: sales, purchases, stock, lens.
+    """
+    wanted = {t.strip() for t in topics.split(",") if t.strip()} if topics else None
+
+    return StreamingResponse(
+        sse_stream(request.is_disconnected, wanted),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
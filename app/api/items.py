@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date, datetime
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.api.security import get_current_user
 from app.schemas.item import *
 from app.crud import item as crud_item
+from app.crud import pricing as crud_pricing
+from app.crud import reorder as crud_reorder
+from app.services import stock_ledger
+from app.services.item_import import iter_import_rows
 
 router = APIRouter(prefix="/items", tags=["Items"])
 
@@ -31,14 +37,110 @@ def add_item(
         data: ItemCreate,
         db: Session = Depends(get_db),
         user=Depends(get_current_user)):
-    return crud_item.create_item(db, data)
+    try:
+        return crud_item.create_item(db, data)
+    except crud_item.DuplicateBarcode as e:
+        raise HTTPException(409, str(e))
 
 
 @router.get("/", response_model=list[ItemOut])
 def get_items(
+        response: Response,
+        limit: int | None = Query(None, ge=1, le=1000),
+        cursor: str | None = None,
+        category_id: int | None = None,
+        brand: str | None = None,
+        updated_since: datetime | None = None,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    """
+    Catalogue listing. Pass `limit` to page (next cursor in X-Next-Cursor)
+    and `updated_since` to fetch only rows changed since the last sync;
+    the first page of a delta sync also lists items deleted since then
+    in X-Deleted-Ids (comma-separated).
+    """
+    try:
+        items, next_cursor = crud_item.list_items(
+            db,
+            limit=limit,
+            cursor=cursor,
+            category_id=category_id,
+            brand=brand,
+            updated_since=updated_since,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if updated_since is not None and not cursor:
+        deleted = crud_item.deleted_item_ids(db, updated_since)
+        response.headers["X-Deleted-Ids"] = ",".join(str(i) for i in deleted)
+
+    return items
+
+
+@router.post("/import")
+def import_items(
+        file: UploadFile = File(...),
+        create_categories: bool = False,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    """
+    Bulk upsert items from a CSV or XLSX file, matched on barcode.
+    Returns counts and a per-row error report.
+    """
+    try:
+        rows = iter_import_rows(file.filename, file.file)
+        return crud_item.import_items(db, rows, create_categories)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@router.post("/price-revision")
+def revise_prices(
+        data: PriceRevisionIn,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    """
+    Bulk price / GST change for every item matching the filter.
+    dry_run (default) returns the match count and a sample of new values.
+    """
+    try:
+        if data.dry_run:
+            return crud_pricing.preview_price_revision(db, data.filter, data.rule)
+        result = crud_pricing.apply_price_revision(
+            db, data.filter, data.rule, user.id, data.note
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    crud_item.barcode_cache.clear()
+    return result
+
+
+@router.get("/stock-as-of")
+def stock_as_of(
+        as_of: date = Query(..., alias="date"),
+        item_id: list[int] | None = Query(None),
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    """
+    Per-item stock and valuation at the end of the given day,
+    rebuilt from the latest snapshot plus ledger movements.
+    """
+    return stock_ledger.stock_as_of(db, as_of, item_id)
+
+
+@router.post("/stock-snapshots")
+def take_stock_snapshot(
+        as_of: date | None = Query(None, alias="date"),
         db: Session = Depends(get_db),
         user=Depends(get_current_user)):
-    return crud_item.list_items(db)
+    written = stock_ledger.take_snapshot(db, as_of)
+    return {"items": written}
+
+
 # ---------- UPDATE ITEM ----------
 @router.put("/{item_id}", response_model=ItemOut)
 def edit_item(
@@ -46,7 +148,10 @@ def edit_item(
         data: ItemUpdate,
         db: Session = Depends(get_db),
         user=Depends(get_current_user)):
-    item = crud_item.update_item(db, item_id, data)
+    try:
+        item = crud_item.update_item(db, item_id, data)
+    except crud_item.DuplicateBarcode as e:
+        raise HTTPException(409, str(e))
     if not item:
         raise HTTPException(404, "Item not found")
     return item
@@ -58,7 +163,10 @@ def remove_item(
         item_id: int,
         db: Session = Depends(get_db),
         user=Depends(get_current_user)):
-    ok = crud_item.delete_item(db, item_id)
+    try:
+        ok = crud_item.delete_item(db, item_id)
+    except crud_item.ItemInUse as e:
+        raise HTTPException(409, str(e))
     if not ok:
         raise HTTPException(404, "Item not found")
     return {"status": "deleted"}
@@ -88,6 +196,17 @@ def remove_category(
         raise HTTPException(404, "Category not found")
     return {"status": "deleted"}
 
+@router.get("/barcode/{code}", response_model=ItemBarcodeOut)
+def scan_barcode(
+        code: str,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    item = crud_item.get_item_by_barcode(db, code)
+    if not item:
+        raise HTTPException(404, "Item not found")
+    return item
+
+
 @router.get("/search", response_model=list[ItemSearchOut])
 def search_items_endpoint(
         q: str = Query(..., min_length=2),
@@ -96,15 +215,19 @@ def search_items_endpoint(
     return crud_item.search_items(db, q)
 
 
-from app.models.all_models import Item
-
 @router.get("/low-stock")
 def low_stock(
         db: Session = Depends(get_db),
         user=Depends(get_current_user)):
 
-    items = db.query(Item).filter(
-        Item.stock_qty <= Item.reorder_level
-    ).all()
+    return [dict(r._mapping) for r in crud_reorder.list_low_stock(db)]
 
-    return items
+
+@router.get("/reorder-suggestions")
+def reorder_suggestions(
+        days: int = Query(30, ge=1, le=365),
+        lead_days: int = Query(7, ge=0, le=180),
+        cover_days: int = Query(30, ge=1, le=365),
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    return crud_reorder.reorder_suggestions(db, days, lead_days, cover_days)
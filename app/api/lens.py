@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.api.security import get_current_user
 from app.schemas.lens import *
 from app.crud import lens as crud
+from app.services.lens_stats import list_supplier_lens_stats
 
 router = APIRouter(prefix="/lens", tags=["Lens"])
 
@@ -31,6 +34,31 @@ def create_order(
         raise HTTPException(status_code=400, detail=str(exc))
 
 
+@router.post("/status/bulk")
+def change_status_bulk(
+        data: BulkStatusUpdate,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    """
+    Move many orders at once; disallowed moves are reported per order.
+    """
+    try:
+        return crud.bulk_update_status(db, data.order_ids, data.status, user.id)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@router.post("/receive")
+def receive_orders(
+        data: BatchReceive,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    """
+    Mark every scanned order label READY in one transaction.
+    """
+    return crud.receive_scanned_orders(db, data.codes, user.id)
+
+
 @router.put("/{order_id}/status")
 def change_status(
         order_id: int,
@@ -45,6 +73,67 @@ def change_status(
 
 @router.get("/")
 def get_orders(
+        response: Response,
+        status: list[str] | None = Query(None),
+        active: bool = False,
+        supplier_id: int | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        limit: int | None = Query(None, ge=1, le=500),
+        cursor: str | None = None,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    """
+    Lens orders newest first. active=true limits the board to orders
+    not yet delivered; pass limit to page, with the next cursor in the
+    X-Next-Cursor header.
+    """
+    statuses = status or (list(crud.ACTIVE_STATUSES) if active else None)
+    try:
+        orders, next_cursor = crud.list_orders(
+            db,
+            statuses=statuses,
+            supplier_id=supplier_id,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return orders
+
+
+@router.get("/counts")
+def get_order_counts(
+        supplier_id: int | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    return crud.count_orders_by_status(db, supplier_id, date_from, date_to)
+
+
+@router.get("/overdue")
+def get_overdue_orders(
+        due_within: int = Query(0, ge=0, le=30),
+        supplier_id: int | None = None,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    """
+    Open orders past expected_date, plus those due within `due_within` days.
+    """
+    return crud.list_overdue_orders(db, due_within, supplier_id)
+
+
+@router.get("/supplier-stats")
+def get_supplier_stats(
         db: Session = Depends(get_db),
         user=Depends(get_current_user)):
-    return crud.list_orders(db)
+    """
+    Per-supplier turnaround, refreshed periodically in the background.
+    """
+    return list_supplier_lens_stats(db)
@@ -1,39 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from decimal import Decimal
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
-from app.models.all_models import Prescription
+from app.api.security import get_current_user
+from app.crud import prescription as crud_rx
+from app.schemas.prescription import PrescriptionIn
+from app.services.item_import import iter_import_rows
 
 router = APIRouter(prefix="/prescriptions", tags=["prescriptions"])
 
 @router.post("/")
 def create_prescription(
-    data: dict,
-    db: Session = Depends(get_db)
+    data: PrescriptionIn,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    try:
+        rx = crud_rx.create_prescription(db, data)
+    except SQLAlchemyError as exc:
+        raise HTTPException(status_code=400, detail=str(getattr(exc, "orig", exc)).strip())
+    return {"id": rx.id}
+
+
+@router.post("/import")
+def import_prescriptions(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """
+    Bulk load Rx records exported from refraction equipment (CSV/XLSX).
+    Diopters are normalised to 0.25 D; returns counts and per-row errors.
+    """
+    try:
+        rows = iter_import_rows(file.filename, file.file)
+        return crud_rx.import_prescriptions(db, rows)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@router.get("/history")
+def prescription_history(
+    phone: str = Query(..., min_length=3),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """
+    All prescriptions recorded for a phone number, newest first.
+    """
+    return crud_rx.prescription_history(db, phone, limit)
+
+
+@router.get("/search")
+def search_prescriptions(
+    response: Response,
+    sphere_min: Decimal | None = None,
+    sphere_max: Decimal | None = None,
+    cyl_min: Decimal | None = None,
+    cyl_max: Decimal | None = None,
+    eye: str = "any",
+    date_from: date | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
 ):
+    """
+    Power-range search (e.g. sphere -8 to -6 for a contact-lens recall).
+    The next-page cursor is returned in the X-Next-Cursor header.
+    """
     try:
-        # QUICK FIX: convert empty strings to None
-        cleaned_data = {}
-
-        numeric_fields = [
-            "sphere_r", "cyl_r", "axis_r", "add_r",
-            "sphere_l", "cyl_l", "axis_l", "add_l",
-            "pd",
-        ]
-
-        for key, value in data.items():
-            if key in numeric_fields and value == "":
-                cleaned_data[key] = None
-            else:
-                cleaned_data[key] = value
-
-        rx = Prescription(**cleaned_data)
-
-        db.add(rx)
-        db.commit()
-        db.refresh(rx)
-
-        return {"id": rx.id}
-    except Exception as exc:
-        # Keep behavior simple: surface validation/DB issues as a 400
-        raise HTTPException(status_code=400, detail=str(exc))
+        rows, next_cursor = crud_rx.search_prescriptions(
+            db,
+            sphere_min=sphere_min,
+            sphere_max=sphere_max,
+            cyl_min=cyl_min,
+            cyl_max=cyl_max,
+            eye=eye,
+            date_from=date_from,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+@router.get("/sale/{sale_id}")
+def prescription_for_sale(
+    sale_id: int,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """
+    Latest prescription on a sale, or {} when there is none.
+    """
+    return crud_rx.latest_for_sale(db, sale_id) or {}
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from itertools import chain
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.api.security import get_current_user
 from app.schemas.purchase import *
-from app.crud.purchase import create_purchase
+from app.crud.purchase import create_purchase, import_supplier_invoices
+from app.services.supplier_invoice import iter_supplier_invoices
 
 router = APIRouter(prefix="/purchase", tags=["Purchase"])
 
@@ -19,3 +22,20 @@ def create_purchase_endpoint(
     except Exception as exc:
         # Surface as a client error while avoiding unhandled 500s
         raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.post("/import")
+def import_purchase_invoices(
+        files: list[UploadFile] = File(...),
+        supplier_id: int | None = None,
+        db: Session = Depends(get_db),
+        user=Depends(get_current_user)):
+    """
+    Post supplier bills (GST e-invoice JSON, CSV or XLSX) as purchases.
+    Lines are matched to items by barcode, HSN + model or model;
+    invoices already posted for the supplier are skipped.
+    """
+    invoices = chain.from_iterable(
+        iter_supplier_invoices(f.filename, f.file) for f in files
+    )
+    return import_supplier_invoices(db, invoices, supplier_id)
@@ -1,16 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Header, Query, Response
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from reportlab.pdfgen import canvas
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from io import BytesIO
 
 from app.api.deps import get_db
 from app.api.security import get_current_user
 from app.schemas.sales import SaleCreate, SaleOut, DeliverIn
-from app.crud.sales import create_sale, get_sale, deliver_sale
-from app.services.invoice_pdf import generate_invoice_pdf
+from app.crud.sales import create_sale, get_sale, deliver_sale, list_sales
+from app.core.config import INVOICE_RENDER_MODE
+from app.services.daily_stats import bump_daily_stats
+from app.services.events import queue_event
+from app.services import stock_ledger
+from app.services.invoice_export import stream_invoice_zip
+from app.services.invoice_pdf import (
+    generate_invoice_pdf,
+    invoice_fingerprint,
+    invoice_snapshot,
+    render_invoice_pdf_bytes,
+)
 from app.services.sales_service import (
     build_sale_detail_response,
     build_sales_list_response,
@@ -36,6 +46,31 @@ def create_sale_endpoint(
     except Exception as e:
         raise HTTPException(400, str(e))
         
+@router.get("/invoices/export")
+def export_invoices(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    user=Depends(get_current_user)
+):
+    """
+    ZIP of every invoice created between `from` and `to` (inclusive),
+    streamed while the invoices are rendered.
+    """
+    if date_to < date_from:
+        raise HTTPException(400, "'to' must not be before 'from'")
+
+    filename = f"invoices_{date_from.isoformat()}_{date_to.isoformat()}.zip"
+
+    return StreamingResponse(
+        stream_invoice_zip(date_from, date_to),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition":
+            f"attachment; filename={filename}"
+        }
+    )
+
+
 @router.get("/{sale_id}")
 def get_sale_endpoint(
         sale_id: int,
@@ -52,6 +87,7 @@ def get_sale_endpoint(
 @router.get("/{sale_id}/pdf")
 def invoice_pdf(
     sale_id:int,
+    if_none_match: str | None = Header(None),
     db:Session=Depends(get_db),
     user=Depends(get_current_user)
  ):
@@ -62,12 +98,34 @@ def invoice_pdf(
     if not sale:
         raise HTTPException(404, "Sale not found")
 
-    pdf_path = generate_invoice_pdf(sale)
+    snapshot = invoice_snapshot(sale)
+    fingerprint = invoice_fingerprint(snapshot)
+    etag = f'"{fingerprint}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    if INVOICE_RENDER_MODE == "memory":
+        pdf_bytes = render_invoice_pdf_bytes(snapshot)
+
+        return Response(
+            content=pdf_bytes,
+            media_type="application/pdf",
+            headers={
+                **cache_headers,
+                "Content-Disposition":
+                f"attachment; filename=invoice_{sale_id}.pdf",
+            }
+        )
+
+    pdf_path = generate_invoice_pdf(snapshot, fingerprint)
 
     return FileResponse(
         pdf_path,
         media_type="application/pdf",
         filename=f"invoice_{sale_id}.pdf",
+        headers=cache_headers,
     )
 
 
@@ -96,7 +154,7 @@ def return_items(
     db:Session = Depends(get_db),
     user=Depends(get_current_user)
 ):
-    from app.models.all_models import Sale, SaleItem, Item
+    from app.models.all_models import Sale, SaleItem
 
     sale = db.query(Sale).get(sale_id)
     if not sale:
@@ -106,13 +164,15 @@ def return_items(
     refund_method = data.get("method","CASH")
 
     refund_total = Decimal(0)
+    restock = {}
+
+    sale_items = {}
+    for si in db.query(SaleItem).filter(SaleItem.sale_id==sale_id).order_by(SaleItem.id):
+        sale_items.setdefault(si.item_id, si)
 
     for r in returned_items:
 
-        sale_item = db.query(SaleItem).filter(
-            SaleItem.sale_id==sale_id,
-            SaleItem.item_id==r["item_id"]
-        ).first()
+        sale_item = sale_items.get(r["item_id"])
 
         if not sale_item:
             raise HTTPException(400,"Invalid item")
@@ -120,18 +180,22 @@ def return_items(
         if r["qty"] > sale_item.qty:
             raise HTTPException(400,"Return exceeds sold")
 
-        # Restore stock
-        item = db.query(Item).get(r["item_id"])
-        item.stock_qty += r["qty"]
+        restock[r["item_id"]] = restock.get(r["item_id"], 0) + r["qty"]
 
         refund_total += Decimal(r["qty"]) * sale_item.price
 
+    # Restore stock
+    stock_ledger.apply_stock_changes(db, restock, stock_ledger.RETURN, sale_id)
+
     # Update sale status
     if refund_total == sale.total:
         sale.status = "FULL_RETURN"
     else:
         sale.status = "PARTIAL_RETURN"
 
+    bump_daily_stats(db, returns_count=1, refund_total=refund_total)
+    queue_event(db, "sales", "sale.returned", sale_id=sale_id, refund=refund_total)
+
     db.commit()
 
     return {
@@ -177,13 +241,37 @@ def return_pdf(
     )
 
 @router.get("/")
-def list_sales(
+def list_sales_endpoint(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=500),
+    cursor: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    payment_status: str | None = None,
+    delivery_status: str | None = None,
     db: Session = Depends(get_db),
     user=Depends(get_current_user)
 ):
-    from app.models.all_models import Sale
+    """
+    Newest-first sales. Without limit every matching sale is returned;
+    with it, the cursor for the next page is returned in the
+    X-Next-Cursor header so the body stays a plain list.
+    """
+    try:
+        sales, next_cursor = list_sales(
+            db,
+            limit=limit,
+            cursor=cursor,
+            date_from=date_from,
+            date_to=date_to,
+            payment_status=payment_status,
+            delivery_status=delivery_status,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
-    sales = db.query(Sale).order_by(Sale.id.desc()).all()
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return build_sales_list_response(sales)
 
@@ -0,0 +1,40 @@
+import threading
+import time
+
+from app.core.cache import LRUCache
+
+
+class TokenBucketLimiter:
+    """
+    In-memory token buckets keyed by an arbitrary string (username, IP).
+
+    Each key may spend `burst` attempts at once and regains one every
+    `refill_seconds`. Idle buckets fall out of the LRU once they would
+    be full again, so memory stays bounded. Limits are per process.
+    """
+
+    def __init__(self, burst: int, refill_seconds: float, maxsize: int = 10000):
+        self.burst = burst
+        self.refill_seconds = refill_seconds
+        self._buckets = LRUCache(maxsize=maxsize, ttl=burst * refill_seconds)
+        self._lock = threading.Lock()
+
+    def _level(self, key, now):
+        tokens, stamp = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - stamp) / self.refill_seconds)
+
+    def consume(self, key) -> float:
+        """
+        Spend one token. Returns 0 when allowed, otherwise the number of
+        seconds until the next token is available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._level(key, now)
+            if tokens < 1:
+                return (1 - tokens) * self.refill_seconds
+            self._buckets.set(key, (tokens - 1, now))
+            return 0.0
+
+    def reset(self, key) -> None:
+        self._buckets.pop(key)
@@ -1,7 +1,12 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt
 from passlib.context import CryptContext
 
+from app.core.config import PASSWORD_HASH_QUEUE, PASSWORD_HASH_WORKERS
+
 SECRET_KEY = "CHANGE_THIS_TO_LONG_RANDOM_STRING"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 600
@@ -17,6 +22,42 @@ def verify_password(plain, hashed):
     return pwd_context.verify(plain, hashed)
 
 
+# ---------- Password (off the event loop) ----------
+class PasswordHasherBusy(Exception):
+    """More hashing work is queued than PASSWORD_HASH_QUEUE allows."""
+
+
+_hash_pool = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+
+
+async def _run_hasher(fn, *args):
+    """
+    Run a bcrypt call on the dedicated pool. Work beyond the pool plus
+    its queue is refused instead of piling up behind it.
+    """
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+    finally:
+        _hash_slots.release()
+
+
+async def hash_password_async(password: str):
+    return await _run_hasher(hash_password, password)
+
+
+async def verify_password_async(plain, hashed):
+    return await _run_hasher(verify_password, plain, hashed)
+
+
+def shutdown_password_pool() -> None:
+    _hash_pool.shutdown(wait=False, cancel_futures=True)
+
+
 # ---------- JWT ----------
 def create_access_token(data: dict):
     to_encode = data.copy()
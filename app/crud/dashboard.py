@@ -1,61 +1,89 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import date
+from sqlalchemy import func, select, true
+from datetime import date, datetime, time, timedelta
 
+from app.crud.reorder import LOW_STOCK
 from app.models.all_models import Sale, Item, LensOrder, Purchase
 
 
+def _day_bounds(day: date):
+    """
+    [start, end) timestamps for a calendar day. Range predicates on
+    created_at stay sargable, unlike func.date(created_at) == day.
+    """
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
 def get_dashboard(db: Session):
 
     today = date.today()
+    start, end = _day_bounds(today)
 
-    # SALES TODAY
-    sales_today = db.query(
-        func.coalesce(func.sum(Sale.total), 0)
-    ).filter(
-        func.date(Sale.created_at) == today
-    ).scalar()
-
-    # SALES COUNT
-    sales_count = db.query(
-        func.count(Sale.id)
-    ).filter(
-        func.date(Sale.created_at) == today
-    ).scalar()
+    # SALES TODAY / SALES COUNT
+    sales = (
+        select(
+            func.coalesce(func.sum(Sale.total), 0).label("sales_today"),
+            func.count(Sale.id).label("sales_count"),
+        )
+        .where(Sale.created_at >= start, Sale.created_at < end)
+        .cte("sales_stats")
+    )
 
     # LOW STOCK
-    low_stock_items = db.query(
-        func.count(Item.id)
-    ).filter(
-        Item.stock_qty <= Item.reorder_level
-    ).scalar()
-
-    # PENDING LENS
-    pending_lens_orders = db.query(
-        func.count(LensOrder.id)
-    ).filter(
-        LensOrder.status != "DELIVERED"
-    ).scalar()
-
-    # READY LENS
-    ready_orders = db.query(
-        func.count(LensOrder.id)
-    ).filter(
-        LensOrder.status == "READY"
-    ).scalar()
+    low_stock = (
+        select(
+            func.count(Item.id).label("low_stock_items"),
+        )
+        .where(LOW_STOCK)
+        .cte("low_stock_stats")
+    )
+
+    # PENDING / READY LENS
+    lens = (
+        select(
+            func.count(LensOrder.id)
+            .filter(LensOrder.status != "DELIVERED")
+            .label("pending_lens_orders"),
+            func.count(LensOrder.id)
+            .filter(LensOrder.status == "READY")
+            .label("ready_orders"),
+        )
+        .where(LensOrder.status != "DELIVERED")
+        .cte("lens_stats")
+    )
 
     # PURCHASE TODAY
-    purchase_today = db.query(
-        func.coalesce(func.sum(Purchase.total), 0)
-    ).filter(
-        func.date(Purchase.created_at) == today
-    ).scalar()
+    purchases = (
+        select(
+            func.coalesce(func.sum(Purchase.total), 0).label("purchase_today"),
+        )
+        .where(Purchase.created_at >= start, Purchase.created_at < end)
+        .cte("purchase_stats")
+    )
+
+    stmt = (
+        select(
+            sales.c.sales_today,
+            sales.c.sales_count,
+            low_stock.c.low_stock_items,
+            lens.c.pending_lens_orders,
+            lens.c.ready_orders,
+            purchases.c.purchase_today,
+        )
+        .select_from(sales)
+        .join(low_stock, true())
+        .join(lens, true())
+        .join(purchases, true())
+    )
+
+    row = db.execute(stmt).one()
 
     return {
-        "sales_today": float(sales_today),
-        "sales_count": sales_count,
-        "low_stock_items": low_stock_items,
-        "pending_lens_orders": pending_lens_orders,
-        "ready_orders": ready_orders,
-        "purchase_today": float(purchase_today),
+        "sales_today": float(row.sales_today),
+        "sales_count": row.sales_count,
+        "low_stock_items": row.low_stock_items,
+        "pending_lens_orders": row.pending_lens_orders,
+        "ready_orders": row.ready_orders,
+        "purchase_today": float(row.purchase_today),
     }
@@ -1,7 +1,29 @@
-from sqlalchemy.exc import SQLAlchemyError
+from datetime import timedelta
+
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.models.all_models import Category, Item
+from app.core.cache import LRUCache
+from app.core.config import BARCODE_CACHE_SIZE, BARCODE_CACHE_TTL, ITEM_SYNC_OVERLAP_SECONDS
+from app.crud.pagination import decode_cursor, encode_cursor
+from app.models.all_models import Category, Item, ItemDeletion, StockMovement
+from app.schemas.item import ItemCreate
+from app.services.events import queue_event
+from app.services.item_import import chunked
+from app.services import stock_ledger
+
+
+# barcode -> ItemBarcodeOut-shaped dict
+barcode_cache = LRUCache(maxsize=BARCODE_CACHE_SIZE, ttl=BARCODE_CACHE_TTL)
+
+
+def _forget_barcodes(*barcodes) -> None:
+    for code in barcodes:
+        if code:
+            barcode_cache.pop(code)
 
 
 def _safe_commit(db: Session) -> None:
@@ -12,6 +34,25 @@ def _safe_commit(db: Session) -> None:
         raise
 
 
+class DuplicateBarcode(ValueError):
+    pass
+
+
+class ItemInUse(ValueError):
+    pass
+
+
+def _raise_if_duplicate_barcode(error: IntegrityError) -> None:
+    """
+    Turn a ux_items_barcode violation into DuplicateBarcode; any other
+    integrity error is left to the caller.
+    """
+    diag = getattr(error.orig, "diag", None)
+    constraint = getattr(diag, "constraint_name", None) or str(error.orig)
+    if "ux_items_barcode" in constraint:
+        raise DuplicateBarcode("Barcode already exists") from error
+
+
 # ---------- CATEGORY ----------
 def create_category(db: Session, name: str, description: str | None = None):
     cat = Category(name=name, description=description)
@@ -28,26 +69,363 @@ def get_categories(db: Session):
 # ---------- ITEMS ----------
 def create_item(db: Session, data):
     item = Item(**data.dict())
-    db.add(item)
-    _safe_commit(db)
+    try:
+        db.add(item)
+        db.flush()
+        stock_ledger.record_movements(
+            db, stock_ledger.OPENING, item.id, {item.id: item.stock_qty or 0}
+        )
+        queue_event(db, "stock", "item.created", item_id=item.id, stock_qty=item.stock_qty)
+        _safe_commit(db)
+    except IntegrityError as e:
+        db.rollback()
+        _raise_if_duplicate_barcode(e)
+        raise
     db.refresh(item)
+    item_search_index.upsert(item)
+    _forget_barcodes(item.barcode)
     return item
 
 
-def list_items(db: Session):
-    return db.query(Item).all()
+def _list_columns():
+    return (
+        Item.id,
+        Item.name,
+        Item.category_id,
+        Item.brand,
+        Item.model,
+        Item.color,
+        Item.size,
+        Item.supplier_name,
+        Item.supplier_gst,
+        Item.supplier_contact,
+        Item.supplier_address,
+        Item.barcode,
+        Item.hsn_code,
+        Item.cost_price,
+        Item.purchase_price,
+        Item.selling_price,
+        Item.gst_percent,
+        Item.stock_qty,
+        Item.updated_at,
+    )
+
+
+def list_items(
+    db: Session,
+    limit: int | None = None,
+    cursor: str | None = None,
+    category_id: int | None = None,
+    brand: str | None = None,
+    updated_since=None,
+):
+    """
+    Catalogue rows as column tuples (no ORM objects).
+
+    Without updated_since rows are ordered by id and the cursor is the
+    last id seen. With updated_since only rows changed after that time
+    are returned, ordered by (updated_at, id), so terminals can keep a
+    local copy in sync. Returns (rows, next_cursor).
+
+    updated_at is stamped when the row is written, but the row only
+    becomes visible at commit. A terminal could already have synced past
+    that stamp, so delta sync looks back ITEM_SYNC_OVERLAP_SECONDS before
+    updated_since. Rows near the boundary may come back twice; terminals
+    upsert by id, so that is harmless. Deleted items are not in these
+    rows; see deleted_item_ids.
+    """
+    query = db.query(*_list_columns())
+
+    if category_id is not None:
+        query = query.filter(Item.category_id == category_id)
+    if brand:
+        query = query.filter(Item.brand == brand)
+
+    if updated_since is not None:
+        since = updated_since - timedelta(seconds=ITEM_SYNC_OVERLAP_SECONDS)
+        query = query.filter(Item.updated_at > since)
+        if cursor:
+            after_updated_at, after_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Item.updated_at, Item.id) > tuple_(after_updated_at, after_id)
+            )
+        query = query.order_by(Item.updated_at, Item.id)
+    else:
+        if cursor:
+            try:
+                after_id = int(cursor)
+            except ValueError:
+                raise ValueError("Invalid cursor")
+            query = query.filter(Item.id > after_id)
+        query = query.order_by(Item.id)
+
+    if limit is None:
+        return query.all(), None
+
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = (
+            encode_cursor(last.updated_at, last.id)
+            if updated_since is not None
+            else str(last.id)
+        )
+
+    return rows, next_cursor
+
+
+def deleted_item_ids(db: Session, updated_since) -> list[int]:
+    """
+    Ids of items deleted after updated_since, with the same look-back
+    as list_items, for terminals to drop from their local copy.
+    """
+    since = updated_since - timedelta(seconds=ITEM_SYNC_OVERLAP_SECONDS)
+    rows = (
+        db.query(ItemDeletion.item_id)
+        .filter(ItemDeletion.deleted_at > since)
+        .order_by(ItemDeletion.item_id)
+        .all()
+    )
+    return [r.item_id for r in rows]
+
+
+# ---------- BULK IMPORT ----------
+IMPORT_CHUNK_SIZE = 1000
+
+# columns never overwritten when an imported barcode already exists
+IMPORT_KEEP_ON_CONFLICT = {"stock_qty"}
+
+# text columns that XLSX may hand over as numbers (barcodes, HSN codes)
+IMPORT_TEXT_FIELDS = {
+    "name", "brand", "model", "color", "size", "barcode", "hsn_code",
+    "supplier_name", "supplier_gst", "supplier_contact", "supplier_address",
+}
+
+
+def _import_text(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+
+def _resolve_categories(db: Session, names, create_missing: bool):
+    names = {n for n in names if n}
+    if not names:
+        return {}
+
+    found = {
+        c.name.lower(): c.id
+        for c in db.query(Category.id, Category.name).filter(
+            func.lower(Category.name).in_([n.lower() for n in names])
+        )
+    }
+
+    missing = [n for n in names if n.lower() not in found]
+    if missing and create_missing:
+        stmt = (
+            pg_insert(Category)
+            .values([{"name": n} for n in missing])
+            .on_conflict_do_nothing(index_elements=[Category.name])
+            .returning(Category.id, Category.name)
+        )
+        for row in db.execute(stmt):
+            found[row.name.lower()] = row.id
+
+    return found
+
+
+def _upsert_chunk(db: Session, payloads):
+    """
+    One multi-row INSERT ... ON CONFLICT (barcode) DO UPDATE per chunk.
+    Returns (inserted, updated).
+
+    Every row carries every column, so a column missing from the sheet
+    or a blank cell arrives as NULL; for existing items those keep the
+    stored value instead of clearing it.
+    """
+    stmt = pg_insert(Item).values(payloads)
+
+    update_cols = {
+        key: func.coalesce(stmt.excluded[key], getattr(Item, key))
+        for key in ItemCreate.__fields__
+        if key not in IMPORT_KEEP_ON_CONFLICT and key != "barcode"
+    }
+    update_cols["updated_at"] = func.clock_timestamp()
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Item.barcode],
+        index_where=text("barcode IS NOT NULL AND barcode <> ''"),
+        set_=update_cols,
+    ).returning(
+        Item.id,
+        Item.stock_qty,
+        literal_column("(xmax = 0)").label("inserted"),
+    )
+
+    inserted = updated = 0
+    opening = {}
+    for row in db.execute(stmt):
+        if row.inserted:
+            inserted += 1
+            opening[row.id] = row.stock_qty or 0
+        else:
+            updated += 1
+
+    # existing items keep their stock, so only new rows open a balance
+    for item_id, qty in opening.items():
+        stock_ledger.record_movements(db, stock_ledger.OPENING, item_id, {item_id: qty})
+
+    return inserted, updated
+
+
+def import_items(db: Session, rows, create_categories: bool = False):
+    """
+    Validate and upsert catalogue rows in chunks of IMPORT_CHUNK_SIZE.
+
+    `rows` yields (row_number, {column: value}); columns are ItemCreate
+    fields, with `category` (name) accepted in place of category_id.
+    Numeric cells in text columns (barcodes, HSN codes read from XLSX)
+    are converted to text, and unknown category ids fail their own row.
+    Items are matched on barcode; existing items keep their stock_qty
+    and any column the sheet leaves out or blank.
+    Each chunk commits on its own, so one bad chunk does not undo the
+    rest. Returns counts plus a per-row error list.
+    """
+    report = {"processed": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": []}
+
+    def fail(row_no, message):
+        report["failed"] += 1
+        report["errors"].append({"row": row_no, "error": message})
+
+    for chunk in chunked(rows, IMPORT_CHUNK_SIZE):
+        report["processed"] += len(chunk)
+
+        categories = _resolve_categories(
+            db,
+            [r.get("category") for _, r in chunk if r.get("category_id") is None],
+            create_categories,
+        )
+
+        candidates = []
+        valid = []
+        seen_barcodes = {}
+
+        for row_no, raw in chunk:
+            data = {k: v for k, v in raw.items() if k in ItemCreate.__fields__}
+            for key in IMPORT_TEXT_FIELDS & data.keys():
+                data[key] = _import_text(data[key])
+
+            if data.get("category_id") is None and raw.get("category"):
+                cid = categories.get(str(raw["category"]).lower())
+                if cid is None:
+                    fail(row_no, f"Unknown category: {raw['category']}")
+                    continue
+                data["category_id"] = cid
+
+            try:
+                item = ItemCreate(**data)
+            except ValidationError as e:
+                fail(row_no, "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+                    for err in e.errors()
+                ))
+                continue
+
+            payload = item.dict()
+            if payload["stock_qty"] is None:
+                payload["stock_qty"] = 0
+            candidates.append((row_no, payload))
+
+        # an unknown category_id would fail the whole chunk's upsert on
+        # the foreign key, so check them all here with one query
+        category_ids = {p["category_id"] for _, p in candidates}
+        known_categories = set()
+        if category_ids:
+            known_categories = {
+                cid for (cid,) in db.query(Category.id).filter(Category.id.in_(category_ids))
+            }
+
+        for row_no, payload in candidates:
+            if payload["category_id"] not in known_categories:
+                fail(row_no, f"Category not found: {payload['category_id']}")
+                continue
+
+            barcode = payload.get("barcode")
+            if barcode:
+                if barcode in seen_barcodes:
+                    fail(row_no, f"Duplicate barcode {barcode} (also on row {seen_barcodes[barcode]})")
+                    continue
+                seen_barcodes[barcode] = row_no
+
+            valid.append((row_no, payload))
+
+        if not valid:
+            if create_categories:
+                _safe_commit(db)
+            continue
+
+        try:
+            inserted, updated = _upsert_chunk(db, [p for _, p in valid])
+            _safe_commit(db)
+        except SQLAlchemyError as e:
+            db.rollback()
+            message = str(getattr(e, "orig", e)).strip()
+            for row_no, _ in valid:
+                fail(row_no, message)
+            continue
+
+        report["inserted"] += inserted
+        report["updated"] += updated
+
+    # bulk writes bypass the per-item cache hooks
+    barcode_cache.clear()
+    item_search_index.invalidate()
+
+    return report
+
 
 # ---------- UPDATE ITEM ----------
 def update_item(db: Session, item_id: int, data):
-    item = db.query(Item).get(item_id)
+    # locked so the stock adjustment below is computed against a
+    # stock_qty no concurrent sale can change before commit
+    item = db.query(Item).filter(Item.id == item_id).with_for_update().first()
     if not item:
         return None
 
-    for key, value in data.dict(exclude_unset=True).items():
+    old_barcode = item.barcode
+    changes = data.dict(exclude_unset=True)
+
+    # stock edits are recorded as ledger adjustments, not overwritten
+    new_stock = changes.pop("stock_qty", None)
+
+    for key, value in changes.items():
         setattr(item, key, value)
 
-    _safe_commit(db)
+    try:
+        if new_stock is not None and new_stock != (item.stock_qty or 0):
+            db.flush()
+            stock_ledger.apply_stock_changes(
+                db,
+                {item.id: new_stock - (item.stock_qty or 0)},
+                stock_ledger.ADJUSTMENT,
+                item.id,
+            )
+            db.expire(item, ["stock_qty"])
+
+        queue_event(db, "stock", "item.updated", item_id=item.id, stock_qty=item.stock_qty)
+        _safe_commit(db)
+    except IntegrityError as e:
+        db.rollback()
+        _raise_if_duplicate_barcode(e)
+        raise
     db.refresh(item)
+    item_search_index.upsert(item)
+    _forget_barcodes(old_barcode, item.barcode)
     return item
 
 
@@ -57,8 +435,31 @@ def delete_item(db: Session, item_id: int):
     if not item:
         return False
 
+    barcode = item.barcode
+
+    # opening balances and manual adjustments only describe the item's
+    # own count and go with it; once it was sold or bought the ledger
+    # (and the FK) keeps the item
+    balance_only = (stock_ledger.OPENING, stock_ledger.ADJUSTMENT)
+    traded = (
+        db.query(StockMovement.id)
+        .filter(StockMovement.item_id == item_id)
+        .filter(StockMovement.movement_type.notin_(balance_only))
+        .first()
+    )
+    if traded:
+        raise ItemInUse("Item has sales or purchases and cannot be deleted")
+
+    db.query(StockMovement).filter(StockMovement.item_id == item_id).delete(
+        synchronize_session=False
+    )
+
     db.delete(item)
+    db.add(ItemDeletion(item_id=item_id))
+    queue_event(db, "stock", "item.deleted", item_id=item_id)
     _safe_commit(db)
+    item_search_index.remove(item_id)
+    _forget_barcodes(barcode)
     return True
 
 
@@ -85,22 +486,86 @@ def delete_category(db: Session, cid: int):
     _safe_commit(db)
     return True
 
-from sqlalchemy import or_
+from sqlalchemy import case, func, or_
+from app.core.config import ITEM_SEARCH_BACKEND
 from app.models.all_models import Item
+from app.services.item_search import item_search_index
 
 
-def search_items(db: Session, query: str, limit: int = 20):
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_columns():
     return (
-        db.query(Item)
-        .filter(
-            or_(
-                Item.name.ilike(f"%{query}%"),
-                Item.brand.ilike(f"%{query}%"),
-                Item.model.ilike(f"%{query}%"),
-                Item.barcode.ilike(f"%{query}%"),
-            )
+        Item.id,
+        Item.name,
+        Item.stock_qty,
+        Item.selling_price,
+        Item.gst_percent,
+    )
+
+
+def get_item_by_barcode(db: Session, code: str):
+    """
+    Exact barcode lookup through the unique index, memoised in an
+    in-process LRU. Returns an ItemBarcodeOut-shaped dict or None.
+    """
+    cached = barcode_cache.get(code)
+    if cached is not None:
+        return cached
+
+    row = (
+        db.query(
+            Item.id,
+            Item.name,
+            Item.barcode,
+            Item.brand,
+            Item.model,
+            Item.hsn_code,
+            Item.selling_price,
+            Item.gst_percent,
         )
+        .filter(Item.barcode == code)
+        .first()
+    )
+    if not row:
+        return None
+
+    summary = dict(row._mapping)
+    barcode_cache.set(code, summary)
+    return summary
+
+
+def search_items(db: Session, query: str, limit: int = 20):
+    """
+    Ranked as-you-type lookup: exact barcode, then prefix matches on
+    name / brand / model / barcode, then substring matches.
+    The ILIKE filters are served by the pg_trgm GIN indexes.
+    """
+    q = query.strip()
+
+    if ITEM_SEARCH_BACKEND == "memory":
+        ids = item_search_index.search(db, q, limit)
+        rows = db.query(*_search_columns()).filter(Item.id.in_(ids)).all()
+        by_id = {r.id: r for r in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    escaped = _like_escape(q)
+    contains = f"%{escaped}%"
+    prefix = f"{escaped}%"
+    fields = (Item.name, Item.brand, Item.model, Item.barcode)
+
+    rank = case(
+        (Item.barcode == q, 0),
+        (or_(*[f.ilike(prefix, escape="\\") for f in fields]), 1),
+        else_=2,
+    )
+
+    return (
+        db.query(*_search_columns())
+        .filter(or_(*[f.ilike(contains, escape="\\") for f in fields]))
+        .order_by(rank, func.length(Item.name), Item.name)
         .limit(limit)
         .all()
     )
-
@@ -1,15 +1,19 @@
-from datetime import date
+from datetime import date, datetime, time, timedelta
 
+from sqlalchemy import cast, Date, func, insert, tuple_, update
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session
 
+from app.crud.pagination import decode_cursor, encode_cursor
 from app.models.all_models import (
+    Customer,
     LensOrder,
     Prescription,
     LensOrderStatusLog,
     Sale,
     Supplier,
 )
+from app.services.events import queue_event
 
 
 def _safe_commit(db: Session) -> None:
@@ -82,6 +86,7 @@ def create_lens_order(db: Session, data):
     )
 
     db.add(log)
+    queue_event(db, "lens", "lens.created", order_id=order.id, status="ORDERED")
     _safe_commit(db)
 
     return order
@@ -115,6 +120,8 @@ def update_status(db: Session, order_id: int, status: str, user_id: int):
 
     db.add(log)
 
+    queue_event(db, "lens", "lens.status", order_id=order_id, status=status)
+
     _safe_commit(db)
 
     db.refresh(order)
@@ -127,20 +134,202 @@ def update_status(db: Session, order_id: int, status: str, user_id: int):
 
 
 # =====================================================
-# LIST ORDERS (your existing correct version)
+# BULK STATUS / BATCH RECEIVE
 # =====================================================
 
-def list_orders(db: Session):
+# allowed moves for bulk updates; DELIVERED is final
+STATUS_TRANSITIONS = {
+    "ORDERED": {"IN_LAB", "READY"},
+    "IN_LAB": {"ORDERED", "READY"},
+    "READY": {"ORDERED", "IN_LAB", "DELIVERED"},
+    "DELIVERED": set(),
+}
+
+ORDER_CODE_PREFIX = "LO"
+
+
+def parse_order_code(code: str) -> int | None:
+    """
+    Lens order id from a scanned label: "LO-000123", "LO123" or "123".
+    """
+    code = (code or "").strip().upper()
+    if code.startswith(ORDER_CODE_PREFIX):
+        code = code[len(ORDER_CODE_PREFIX):].lstrip("-")
+    return int(code) if code.isdigit() else None
+
+
+def bulk_update_status(db: Session, order_ids, status: str, user_id: int):
+    """
+    Move many orders to `status` in one transaction: one locking read,
+    one UPDATE for every accepted order and one multi-row log insert.
+
+    Orders that are missing, already in `status` or not allowed to make
+    the move are reported and left untouched.
+    """
+    status = status.strip().upper()
+    if status not in STATUS_TRANSITIONS:
+        raise ValueError(f"Unknown status: {status}")
+
+    wanted = list(dict.fromkeys(order_ids))
+    current = dict(
+        db.query(LensOrder.id, LensOrder.status)
+        .filter(LensOrder.id.in_(wanted))
+        .order_by(LensOrder.id)
+        .with_for_update()
+        .all()
+    ) if wanted else {}
+
+    updated, unchanged, rejected = [], [], []
+
+    for order_id in wanted:
+        if order_id not in current:
+            rejected.append({"order_id": order_id, "error": "Order not found"})
+            continue
+
+        old = current[order_id]
+        if old == status:
+            unchanged.append(order_id)
+        elif old in STATUS_TRANSITIONS and status not in STATUS_TRANSITIONS[old]:
+            rejected.append({"order_id": order_id, "error": f"Cannot move from {old} to {status}"})
+        else:
+            updated.append(order_id)
+
+    if updated:
+        db.execute(
+            update(LensOrder)
+            .where(LensOrder.id.in_(updated))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            insert(LensOrderStatusLog).values(
+                [
+                    {"lens_order_id": order_id, "status": status, "changed_by": user_id}
+                    for order_id in updated
+                ]
+            )
+        )
+        for order_id in updated:
+            queue_event(db, "lens", "lens.status", order_id=order_id, status=status)
+
+    _safe_commit(db)
 
-    orders = (
-        db.query(LensOrder)
-        .options(
-            selectinload(LensOrder.sale).selectinload(Sale.customer),
-            selectinload(LensOrder.supplier),
+    return {
+        "status": status,
+        "updated": updated,
+        "unchanged": unchanged,
+        "rejected": rejected,
+    }
+
+
+def receive_scanned_orders(db: Session, codes, user_id: int):
+    """
+    Batch receive from the lab: every scanned order label becomes READY.
+    """
+    order_ids, unreadable = [], []
+    for code in codes:
+        order_id = parse_order_code(code)
+        if order_id is None:
+            unreadable.append(code)
+        else:
+            order_ids.append(order_id)
+
+    result = bulk_update_status(db, order_ids, "READY", user_id)
+    result["rejected"] += [{"code": code, "error": "Unreadable code"} for code in unreadable]
+    return result
+
+
+# =====================================================
+# LIST ORDERS (lab board)
+# =====================================================
+
+# everything still in the lab's hands; DELIVERED is history
+ACTIVE_STATUSES = ("ORDERED", "IN_LAB", "READY")
+
+
+def _encode_order_cursor(order_date: date, order_id: int) -> str:
+    return encode_cursor(datetime.combine(order_date, time.min), order_id)
+
+
+def _order_day():
+    # orders without an order_date page by the day they were created;
+    # matches ix_lens_orders_order_day_id
+    return func.coalesce(LensOrder.order_date, cast(LensOrder.created_at, Date))
+
+
+def _board_filters(query, statuses=None, supplier_id=None, date_from=None, date_to=None):
+    if statuses:
+        query = query.filter(LensOrder.status.in_(statuses))
+    if supplier_id:
+        query = query.filter(LensOrder.supplier_id == supplier_id)
+    if date_from:
+        query = query.filter(LensOrder.order_date >= date_from)
+    if date_to:
+        query = query.filter(LensOrder.order_date <= date_to)
+    return query
+
+
+def list_orders(
+    db: Session,
+    statuses=None,
+    supplier_id: int | None = None,
+    date_from=None,
+    date_to=None,
+    limit: int | None = None,
+    cursor: str | None = None,
+):
+    """
+    Lens orders newest first, as flat rows built from one joined query.
+
+    Filters use the (status, order_date) index; pages are keyset on
+    (order_date, id), with the creation day standing in for a missing
+    order_date. Without a limit every matching order is returned.
+    Returns (rows, next_cursor).
+    """
+    order_day = _order_day()
+    query = (
+        db.query(
+            LensOrder.id,
+            LensOrder.lens_type,
+            LensOrder.index_value,
+            LensOrder.coating,
+            LensOrder.tint,
+            LensOrder.status,
+            LensOrder.order_date,
+            LensOrder.expected_date,
+            LensOrder.sale_id,
+            LensOrder.supplier_id,
+            LensOrder.prescription_id,
+            Sale.customer_name,
+            Sale.customer_phone,
+            Customer.name.label("customer_name_fallback"),
+            Customer.phone.label("customer_phone_fallback"),
+            Supplier.name.label("supplier_name"),
+            order_day.label("order_day"),
         )
-        .order_by(LensOrder.id.desc())
-        .all()
+        .outerjoin(Sale, Sale.id == LensOrder.sale_id)
+        .outerjoin(Customer, Customer.id == Sale.customer_id)
+        .outerjoin(Supplier, Supplier.id == LensOrder.supplier_id)
     )
+    query = _board_filters(query, statuses, supplier_id, date_from, date_to)
+
+    if cursor:
+        after_date, after_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(order_day, LensOrder.id) < tuple_(after_date.date(), after_id)
+        )
+
+    query = query.order_by(order_day.desc().nulls_last(), LensOrder.id.desc())
+    if limit:
+        query = query.limit(limit + 1)
+
+    orders = query.all()
+
+    next_cursor = None
+    if limit and len(orders) > limit:
+        orders = orders[:limit]
+        last = orders[-1]
+        next_cursor = _encode_order_cursor(last.order_day, last.id)
 
     result = []
 
@@ -150,19 +339,10 @@ def list_orders(db: Session):
 
             "id": o.id,
 
-            "patient_name": (
-                o.sale.customer_name
-                or (o.sale.customer.name if o.sale and o.sale.customer else "")
-                if o.sale else ""
-            ),
-
-            "patient_phone": (
-                o.sale.customer_phone
-                or (o.sale.customer.phone if o.sale and o.sale.customer else "")
-                if o.sale else ""
-            ),
+            "patient_name": o.customer_name or o.customer_name_fallback or "",
+            "patient_phone": o.customer_phone or o.customer_phone_fallback or "",
 
-            "supplier": o.supplier.name if o.supplier else "",
+            "supplier": o.supplier_name or "",
 
             "lens_type": o.lens_type,
             "index_value": o.index_value,
@@ -187,4 +367,70 @@ def list_orders(db: Session):
 
         })
 
-    return result
+    return result, next_cursor
+
+
+def count_orders_by_status(
+    db: Session,
+    supplier_id: int | None = None,
+    date_from=None,
+    date_to=None,
+):
+    """
+    {status: count} for the board tabs, answered from the status index.
+    """
+    query = db.query(LensOrder.status, func.count(LensOrder.id))
+    query = _board_filters(query, None, supplier_id, date_from, date_to)
+    return {status or "": n for status, n in query.group_by(LensOrder.status)}
+
+
+# =====================================================
+# OVERDUE / DUE SOON
+# =====================================================
+
+def list_overdue_orders(db: Session, due_within_days: int = 0, supplier_id: int | None = None):
+    """
+    Undelivered orders whose expected_date has passed or falls within
+    the next `due_within_days`, most overdue first. Reads the partial
+    expected_date index over open orders only.
+    """
+    today = date.today()
+
+    query = (
+        db.query(
+            LensOrder.id,
+            LensOrder.status,
+            LensOrder.order_date,
+            LensOrder.expected_date,
+            LensOrder.sale_id,
+            LensOrder.supplier_id,
+            Sale.customer_name,
+            Sale.customer_phone,
+            Supplier.name.label("supplier_name"),
+        )
+        .outerjoin(Sale, Sale.id == LensOrder.sale_id)
+        .outerjoin(Supplier, Supplier.id == LensOrder.supplier_id)
+        .filter(LensOrder.status != "DELIVERED")
+        .filter(LensOrder.expected_date <= today + timedelta(days=due_within_days))
+    )
+    if supplier_id:
+        query = query.filter(LensOrder.supplier_id == supplier_id)
+
+    rows = query.order_by(LensOrder.expected_date, LensOrder.id).all()
+
+    return [
+        {
+            "id": o.id,
+            "status": o.status,
+            "patient_name": o.customer_name or "",
+            "patient_phone": o.customer_phone or "",
+            "supplier": o.supplier_name or "",
+            "supplier_id": o.supplier_id,
+            "sale_id": o.sale_id,
+            "order_date": o.order_date.strftime("%Y-%m-%d") if o.order_date else "",
+            "expected_date": o.expected_date.strftime("%Y-%m-%d"),
+            "days_overdue": (today - o.expected_date).days,
+            "state": "overdue" if o.expected_date < today else "due_soon",
+        }
+        for o in rows
+    ]
@@ -0,0 +1,19 @@
+import base64
+from datetime import datetime
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """
+    Opaque keyset cursor for (timestamp, id) ordered listings.
+    """
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        sort_value, row_id = raw.split("|")
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
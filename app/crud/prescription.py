@@ -0,0 +1,342 @@
+from pydantic import ValidationError
+from sqlalchemy import and_, func, insert, or_, select, tuple_, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.crud.pagination import decode_cursor, encode_cursor
+from app.models.all_models import Customer, Prescription, Sale
+from app.schemas.prescription import PrescriptionImportRow
+from app.services.item_import import chunked
+
+
+RX_FIELDS = (
+    "sphere_r", "cyl_r", "axis_r", "add_r",
+    "sphere_l", "cyl_l", "axis_l", "add_l",
+    "pd",
+)
+
+IMPORT_CHUNK_SIZE = 1000
+
+# refraction equipment export header -> PrescriptionImportRow field
+IMPORT_ALIASES = {
+    "sale_id": ("sale_id",),
+    "phone": ("phone", "mobile", "customer_phone"),
+    "customer_name": ("customer_name", "patient_name", "name"),
+    "recorded_at": ("recorded_at", "exam_date", "date"),
+    "sphere_r": ("sphere_r", "r_sph", "od_sph"),
+    "cyl_r": ("cyl_r", "r_cyl", "od_cyl"),
+    "axis_r": ("axis_r", "r_axis", "od_axis"),
+    "add_r": ("add_r", "r_add", "od_add"),
+    "sphere_l": ("sphere_l", "l_sph", "os_sph"),
+    "cyl_l": ("cyl_l", "l_cyl", "os_cyl"),
+    "axis_l": ("axis_l", "l_axis", "os_axis"),
+    "add_l": ("add_l", "l_add", "os_add"),
+    "pd": ("pd",),
+    "notes": ("notes", "remarks"),
+}
+
+
+def _safe_commit(db: Session) -> None:
+    try:
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+
+
+def _rx_query(db: Session):
+    """
+    Prescription rows with the customer taken from the sale, falling
+    back to the linked customer record (the sale's, or the Rx's own for
+    prescriptions recorded without a sale).
+    """
+    return (
+        db.query(
+            Prescription,
+            func.coalesce(Sale.customer_name, Customer.name).label("customer_name"),
+            func.coalesce(Sale.customer_phone, Customer.phone).label("customer_phone"),
+        )
+        .outerjoin(Sale, Sale.id == Prescription.sale_id)
+        .outerjoin(
+            Customer,
+            Customer.id == func.coalesce(Sale.customer_id, Prescription.customer_id),
+        )
+    )
+
+
+def _rx_dict(row) -> dict:
+    rx = row.Prescription
+    out = {
+        "id": rx.id,
+        "sale_id": rx.sale_id,
+        "customer_id": rx.customer_id,
+        "customer_name": row.customer_name or "",
+        "customer_phone": row.customer_phone or "",
+        "notes": rx.notes,
+        "created_at": rx.created_at.isoformat() if rx.created_at else None,
+    }
+    for field in RX_FIELDS:
+        value = getattr(rx, field)
+        if value is not None and not field.startswith("axis"):
+            value = float(value)
+        out[field] = value
+    return out
+
+
+# =========================================================
+# CREATE / IMPORT
+# =========================================================
+def create_prescription(db: Session, data):
+    rx = Prescription(**data.dict())
+    db.add(rx)
+    _safe_commit(db)
+    db.refresh(rx)
+    return rx
+
+
+def _import_fields(raw: dict) -> dict:
+    data = {}
+    for field, keys in IMPORT_ALIASES.items():
+        for key in keys:
+            if raw.get(key) is not None:
+                data[field] = raw[key]
+                break
+
+    phone = data.get("phone")
+    if isinstance(phone, float) and phone.is_integer():
+        # phone numbers read from XLSX as numbers
+        phone = int(phone)
+    if phone is not None:
+        data["phone"] = str(phone).strip()
+    return data
+
+
+def _resolve_customers(db: Session, names_by_phone: dict) -> dict:
+    """
+    phone -> customer id, creating customers that do not exist yet.
+    """
+    if not names_by_phone:
+        return {}
+
+    found = {
+        c.phone: c.id
+        for c in db.query(Customer.id, Customer.phone).filter(
+            Customer.phone.in_(names_by_phone)
+        )
+    }
+
+    missing = [p for p in names_by_phone if p not in found]
+    if missing:
+        stmt = (
+            pg_insert(Customer)
+            .values([{"phone": p, "name": names_by_phone[p]} for p in missing])
+            .on_conflict_do_nothing(index_elements=[Customer.phone])
+            .returning(Customer.id, Customer.phone)
+        )
+        for row in db.execute(stmt):
+            found[row.phone] = row.id
+
+    return found
+
+
+def import_prescriptions(db: Session, rows):
+    """
+    Validate and insert Rx records in chunks of IMPORT_CHUNK_SIZE.
+
+    `rows` yields (row_number, {column: value}) as read by
+    iter_import_rows; common refraction-equipment headers are accepted
+    (see IMPORT_ALIASES). Each row needs a sale_id or a phone number;
+    customers are created for unknown phones. Each chunk is inserted
+    with executemany and commits on its own. Returns counts plus a
+    per-row error list.
+    """
+    report = {"processed": 0, "inserted": 0, "failed": 0, "errors": []}
+
+    def fail(row_no, message):
+        report["failed"] += 1
+        report["errors"].append({"row": row_no, "error": message})
+
+    for chunk in chunked(rows, IMPORT_CHUNK_SIZE):
+        report["processed"] += len(chunk)
+
+        valid = []
+        for row_no, raw in chunk:
+            try:
+                rx = PrescriptionImportRow(**_import_fields(raw))
+            except ValidationError as e:
+                fail(row_no, "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}"
+                    for err in e.errors()
+                ))
+                continue
+            valid.append((row_no, rx))
+
+        sale_ids = {rx.sale_id for _, rx in valid if rx.sale_id is not None}
+        known_sales = set()
+        if sale_ids:
+            known_sales = {
+                sid for (sid,) in db.query(Sale.id).filter(Sale.id.in_(sale_ids))
+            }
+
+        rows_ok = []
+        for row_no, rx in valid:
+            if rx.sale_id is not None and rx.sale_id not in known_sales:
+                fail(row_no, f"Sale not found: {rx.sale_id}")
+            else:
+                rows_ok.append((row_no, rx))
+
+        if not rows_ok:
+            continue
+
+        try:
+            customers = _resolve_customers(
+                db, {rx.phone: rx.customer_name for _, rx in rows_ok if rx.phone}
+            )
+
+            # rows without a date take the database default, so they are
+            # inserted separately from dated ones
+            dated, undated = [], []
+            for _, rx in rows_ok:
+                values = rx.dict(include={"sale_id", *RX_FIELDS, "notes"})
+                values["customer_id"] = customers.get(rx.phone)
+                if rx.recorded_at:
+                    dated.append({**values, "created_at": rx.recorded_at})
+                else:
+                    undated.append(values)
+
+            for batch in (dated, undated):
+                if batch:
+                    db.execute(insert(Prescription), batch)
+            _safe_commit(db)
+        except SQLAlchemyError as e:
+            db.rollback()
+            message = str(getattr(e, "orig", e)).strip()
+            for row_no, _ in rows_ok:
+                fail(row_no, message)
+            continue
+
+        report["inserted"] += len(rows_ok)
+
+    return report
+
+
+# =========================================================
+# LOOKUPS
+# =========================================================
+def latest_for_sale(db: Session, sale_id: int):
+    row = (
+        _rx_query(db)
+        .filter(Prescription.sale_id == sale_id)
+        .order_by(Prescription.id.desc())
+        .first()
+    )
+    return _rx_dict(row) if row else None
+
+
+def prescription_history(db: Session, phone: str, limit: int = 50):
+    """
+    Every Rx recorded for a phone number, newest first.
+
+    The number is matched on the sale itself and on the linked customer;
+    both sides resolve to sale ids through indexes, then prescriptions
+    are read by sale_id. Prescriptions without a sale are matched on
+    their own customer_id.
+    """
+    phone = (phone or "").strip()
+    if not phone:
+        return []
+
+    sale_ids = union(
+        select(Sale.id).where(Sale.customer_phone == phone),
+        select(Sale.id)
+        .join(Customer, Customer.id == Sale.customer_id)
+        .where(Customer.phone == phone),
+    ).subquery("phone_sales")
+
+    customer_ids = select(Customer.id).where(Customer.phone == phone)
+
+    rows = (
+        _rx_query(db)
+        .filter(
+            or_(
+                Prescription.sale_id.in_(select(sale_ids.c.id)),
+                Prescription.customer_id.in_(customer_ids),
+            )
+        )
+        .order_by(Prescription.created_at.desc(), Prescription.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [_rx_dict(r) for r in rows]
+
+
+def _power_range(sphere_col, cyl_col, sphere_min, sphere_max, cyl_min, cyl_max):
+    clauses = []
+    if sphere_min is not None:
+        clauses.append(sphere_col >= sphere_min)
+    if sphere_max is not None:
+        clauses.append(sphere_col <= sphere_max)
+    if cyl_min is not None:
+        clauses.append(cyl_col >= cyl_min)
+    if cyl_max is not None:
+        clauses.append(cyl_col <= cyl_max)
+    return clauses
+
+
+def search_prescriptions(
+    db: Session,
+    sphere_min=None,
+    sphere_max=None,
+    cyl_min=None,
+    cyl_max=None,
+    eye: str = "any",
+    date_from=None,
+    limit: int = 100,
+    cursor: str | None = None,
+):
+    """
+    Prescriptions with sphere / cyl inside the given ranges for the
+    right eye, left eye or either, newest first, keyset-paged on
+    (created_at, id). Returns (rows, next_cursor).
+    """
+    if eye not in ("any", "right", "left"):
+        raise ValueError("eye must be any, right or left")
+
+    bounds = (sphere_min, sphere_max, cyl_min, cyl_max)
+    if all(b is None for b in bounds):
+        raise ValueError("Give at least one sphere or cyl bound")
+
+    right = _power_range(Prescription.sphere_r, Prescription.cyl_r, *bounds)
+    left = _power_range(Prescription.sphere_l, Prescription.cyl_l, *bounds)
+
+    query = _rx_query(db)
+    if eye == "right":
+        query = query.filter(*right)
+    elif eye == "left":
+        query = query.filter(*left)
+    else:
+        query = query.filter(or_(and_(*right), and_(*left)))
+
+    if date_from:
+        query = query.filter(Prescription.created_at >= date_from)
+
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Prescription.created_at, Prescription.id) < tuple_(after_created_at, after_id)
+        )
+
+    rows = (
+        query.order_by(Prescription.created_at.desc(), Prescription.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1].Prescription
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return [_rx_dict(r) for r in rows], next_cursor
@@ -0,0 +1,196 @@
+from decimal import Decimal
+
+from sqlalchemy import func, insert, literal, null, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.all_models import Item, PriceRevision, PriceRevisionItem
+from app.services.events import queue_event
+
+
+PREVIEW_ROWS = 20
+
+
+def _safe_commit(db: Session) -> None:
+    try:
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+
+
+def _filter_clauses(flt):
+    clauses = []
+    if flt.category_id is not None:
+        clauses.append(Item.category_id == flt.category_id)
+    if flt.brand:
+        clauses.append(Item.brand == flt.brand)
+    if flt.hsn_code:
+        clauses.append(Item.hsn_code == flt.hsn_code)
+    if flt.supplier_name:
+        clauses.append(Item.supplier_name == flt.supplier_name)
+    return clauses
+
+
+def _new_price_expr(column, rule):
+    """
+    SQL expression for the revised price, rounded to paise and never
+    below zero.
+    """
+    value = Decimal(rule.value)
+    if rule.mode == "percent":
+        expr = column * (Decimal("1") + value / Decimal("100"))
+    else:
+        expr = column + value
+    return func.greatest(func.round(expr, 2), 0)
+
+
+def _validate_rule(rule) -> None:
+    has_price = rule.field is not None and rule.value is not None
+    if not has_price and rule.gst_percent is None:
+        raise ValueError("Rule must change a price (field + value) or gst_percent")
+    if (rule.field is None) != (rule.value is None):
+        raise ValueError("field and value must be given together")
+    if rule.gst_percent is not None and not (0 <= rule.gst_percent <= 100):
+        raise ValueError("gst_percent must be between 0 and 100")
+
+
+# =========================================================
+# PREVIEW / APPLY
+# =========================================================
+def preview_price_revision(db: Session, flt, rule):
+    """
+    Dry run: number of matching items and a sample of old -> new values,
+    computed with the same SQL expressions the update would use.
+    """
+    _validate_rule(rule)
+    clauses = _filter_clauses(flt)
+
+    price_col = getattr(Item, rule.field) if rule.field else None
+    new_price = _new_price_expr(price_col, rule) if price_col is not None else None
+
+    count = db.query(func.count(Item.id)).filter(*clauses).scalar()
+
+    columns = [Item.id, Item.name, Item.gst_percent.label("old_gst_percent")]
+    if price_col is not None:
+        columns += [price_col.label("old_price"), new_price.label("new_price")]
+
+    sample = (
+        db.query(*columns)
+        .filter(*clauses)
+        .order_by(Item.id)
+        .limit(PREVIEW_ROWS)
+        .all()
+    )
+
+    return {
+        "dry_run": True,
+        "affected_count": count,
+        "sample": [
+            {
+                "item_id": r.id,
+                "name": r.name,
+                "old_price": getattr(r, "old_price", None),
+                "new_price": getattr(r, "new_price", None),
+                "old_gst_percent": r.old_gst_percent,
+                "new_gst_percent": (
+                    rule.gst_percent if rule.gst_percent is not None else r.old_gst_percent
+                ),
+            }
+            for r in sample
+        ],
+    }
+
+
+def apply_price_revision(db: Session, flt, rule, user_id: int, note: str | None = None):
+    """
+    Apply the rule to every matching item in one statement:
+
+        WITH old AS (SELECT ... FOR UPDATE),
+             upd AS (UPDATE items ... FROM old RETURNING old/new values)
+        INSERT INTO price_revision_items SELECT ... FROM upd
+
+    so the per-item audit trail is written by the same statement.
+    """
+    _validate_rule(rule)
+    clauses = _filter_clauses(flt)
+
+    revision = PriceRevision(
+        filters=flt.dict(),
+        # JSON columns cannot hold Decimal
+        rule={k: (str(v) if isinstance(v, Decimal) else v) for k, v in rule.dict().items()},
+        note=note,
+        created_by=user_id,
+    )
+    db.add(revision)
+    db.flush()
+
+    price_col = getattr(Item, rule.field) if rule.field else None
+
+    old = (
+        select(
+            Item.id,
+            (price_col if price_col is not None else null()).label("price"),
+            Item.gst_percent,
+        )
+        .where(*clauses)
+        .with_for_update()
+        .cte("old")
+    )
+
+    values = {"updated_at": func.clock_timestamp()}
+    if price_col is not None:
+        values[rule.field] = _new_price_expr(price_col, rule)
+    if rule.gst_percent is not None:
+        values["gst_percent"] = rule.gst_percent
+
+    new_price_col = price_col if price_col is not None else null()
+
+    upd = (
+        update(Item)
+        .where(Item.id == old.c.id)
+        .values(**values)
+        .returning(
+            Item.id.label("item_id"),
+            old.c.price.label("old_price"),
+            new_price_col.label("new_price"),
+            old.c.gst_percent.label("old_gst_percent"),
+            Item.gst_percent.label("new_gst_percent"),
+        )
+        .cte("upd")
+    )
+
+    stmt = insert(PriceRevisionItem).from_select(
+        [
+            "revision_id",
+            "item_id",
+            "old_price",
+            "new_price",
+            "old_gst_percent",
+            "new_gst_percent",
+        ],
+        select(
+            literal(revision.id),
+            upd.c.item_id,
+            upd.c.old_price,
+            upd.c.new_price,
+            upd.c.old_gst_percent,
+            upd.c.new_gst_percent,
+        ),
+    )
+
+    result = db.execute(stmt)
+    revision.affected_count = result.rowcount
+
+    queue_event(
+        db, "stock", "items.repriced",
+        revision_id=revision.id, affected_count=revision.affected_count,
+    )
+
+    _safe_commit(db)
+
+    return {
+        "dry_run": False,
+        "revision_id": revision.id,
+        "affected_count": revision.affected_count,
+    }
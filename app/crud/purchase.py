@@ -1,13 +1,21 @@
 from decimal import Decimal
 
+from sqlalchemy import insert, tuple_
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.models.all_models import (
+    Item,
     Purchase,
     PurchaseItem,
-    Item,
-    StockMovement,
+    Supplier,
 )
+from app.services.daily_stats import bump_daily_stats
+from app.services.events import queue_event
+from app.services.item_import import chunked
+from app.services import stock_ledger
+
+
+INVOICE_IMPORT_CHUNK_SIZE = 50
 
 
 def _safe_commit(db) -> None:
@@ -18,51 +26,279 @@ def _safe_commit(db) -> None:
         raise
 
 
+def _validate_lines(db, lines) -> None:
+    """
+    Reject the whole purchase before anything is written: empty bills,
+    non-positive quantities, negative prices and unknown item ids.
+    """
+    if not lines:
+        raise ValueError("Purchase has no items")
+
+    for row in lines:
+        if row.qty <= 0:
+            raise ValueError(f"Quantity must be positive for item {row.item_id}")
+        if row.price < 0:
+            raise ValueError(f"Price cannot be negative for item {row.item_id}")
+
+    wanted = {row.item_id for row in lines}
+    found = {
+        item_id
+        for (item_id,) in db.query(Item.id).filter(Item.id.in_(wanted))
+    }
+    missing = wanted - found
+    if missing:
+        raise ValueError(f"Item not found: {', '.join(map(str, sorted(missing)))}")
+
+
 def create_purchase(db, data):
+    """
+    Post a supplier bill in one transaction: one lookup to validate the
+    items, one multi-row insert for the lines and one set-based stock
+    increment through the ledger.
+    """
+    _validate_lines(db, data.items)
 
-    total = Decimal(0)
+    total = sum((row.qty * row.price for row in data.items), Decimal(0))
 
     purchase = Purchase(
         supplier_id=data.supplier_id,
         invoice_no=data.invoice_no,
+        total=total,
     )
 
     db.add(purchase)
     db.flush()
 
+    db.execute(
+        insert(PurchaseItem),
+        [
+            {
+                "purchase_id": purchase.id,
+                "item_id": row.item_id,
+                "qty": row.qty,
+                "price": row.price,
+                "gst_percent": row.gst_percent,
+            }
+            for row in data.items
+        ],
+    )
+
+    qty_by_item = {}
     for row in data.items:
+        qty_by_item[row.item_id] = qty_by_item.get(row.item_id, 0) + row.qty
+
+    # ---------- Update Stock + Movement Log ----------
+    try:
+        stock_ledger.apply_stock_changes(
+            db, qty_by_item, stock_ledger.PURCHASE, purchase.id
+        )
+    except ValueError:
+        db.rollback()
+        raise
 
-        item = db.query(Item).get(row.item_id)
+    bump_daily_stats(db, purchase_count=1, purchase_total=total)
 
-        line_total = row.qty * row.price
-        total += line_total
+    queue_event(db, "purchases", "purchase.created", purchase_id=purchase.id, total=total)
 
-        db.add(
-            PurchaseItem(
-                purchase_id=purchase.id,
-                item_id=row.item_id,
-                qty=row.qty,
-                price=row.price,
-                gst_percent=row.gst_percent,
-            )
+    _safe_commit(db)
+    db.refresh(purchase)
+
+    return purchase
+
+
+# =========================================================
+# SUPPLIER INVOICE IMPORT
+# =========================================================
+def _match_lines(db, invoices):
+    """
+    Resolve every line in the chunk to an item id with two indexed
+    lookups: barcode first, then (hsn_code, model), then model alone.
+    Writes line["item_id"] or appends to the invoice's errors.
+    """
+    lines = [line for inv in invoices for line in inv["lines"]]
+    barcodes = {l["barcode"] for l in lines if l["barcode"]}
+    models = {l["model"] or l["name"] for l in lines if l["model"] or l["name"]}
+
+    by_barcode = {}
+    if barcodes:
+        by_barcode = {
+            r.barcode: r.id
+            for r in db.query(Item.id, Item.barcode).filter(Item.barcode.in_(barcodes))
+        }
+
+    by_hsn_model, by_model = {}, {}
+    if models:
+        for r in db.query(Item.id, Item.model, Item.hsn_code).filter(Item.model.in_(models)):
+            by_hsn_model.setdefault((r.hsn_code, r.model), []).append(r.id)
+            by_model.setdefault(r.model, []).append(r.id)
+
+    for inv in invoices:
+        for line in inv["lines"]:
+            model = line["model"] or line["name"]
+
+            if line["barcode"] in by_barcode:
+                line["item_id"] = by_barcode[line["barcode"]]
+                continue
+
+            candidates = by_hsn_model.get((line["hsn_code"], model)) or by_model.get(model) or []
+            if len(candidates) == 1:
+                line["item_id"] = candidates[0]
+            elif candidates:
+                inv["errors"].append(f"line {line['line']}: model {model} matches several items")
+            else:
+                key = line["barcode"] or model or line["hsn_code"]
+                inv["errors"].append(f"line {line['line']}: no item matches {key}")
+
+
+def _resolve_suppliers(db, invoices, default_supplier_id):
+    gstins = {inv["supplier_gstin"] for inv in invoices if inv["supplier_gstin"]}
+    found = {}
+    if gstins:
+        found = {
+            r.gstin: r.id
+            for r in db.query(Supplier.id, Supplier.gstin).filter(Supplier.gstin.in_(gstins))
+        }
+
+    for inv in invoices:
+        inv["supplier_id"] = found.get(inv["supplier_gstin"], default_supplier_id)
+        if inv["supplier_id"] is None:
+            inv["errors"].append(f"Unknown supplier GSTIN {inv['supplier_gstin'] or '(none)'}")
+
+
+def _post_invoices(db, invoices):
+    """
+    Create purchases, lines and stock movements for a chunk of clean,
+    de-duplicated invoices. Does not commit.
+    """
+    rows = db.execute(
+        insert(Purchase)
+        .values(
+            [
+                {
+                    "supplier_id": inv["supplier_id"],
+                    "invoice_no": inv["invoice_no"],
+                    "date": inv["date"],
+                    "total": sum((l["qty"] * l["price"] for l in inv["lines"]), Decimal(0)),
+                }
+                for inv in invoices
+            ]
         )
+        .returning(Purchase.id, Purchase.supplier_id, Purchase.invoice_no, Purchase.total)
+    ).all()
+    ids = {(r.supplier_id, r.invoice_no): r for r in rows}
 
-        # ---------- Update Stock ----------
-        item.stock_qty += row.qty
+    db.execute(
+        insert(PurchaseItem),
+        [
+            {
+                "purchase_id": ids[(inv["supplier_id"], inv["invoice_no"])].id,
+                "item_id": line["item_id"],
+                "qty": line["qty"],
+                "price": line["price"],
+                "gst_percent": line["gst_percent"],
+            }
+            for inv in invoices
+            for line in inv["lines"]
+        ],
+    )
 
-        # ---------- Movement Log ----------
-        db.add(
-            StockMovement(
-                item_id=row.item_id,
-                change_qty=row.qty,
-                movement_type="PURCHASE",
-                reference_id=purchase.id,
-            )
+    for inv in invoices:
+        purchase = ids[(inv["supplier_id"], inv["invoice_no"])]
+        qty_by_item = {}
+        for line in inv["lines"]:
+            qty_by_item[line["item_id"]] = qty_by_item.get(line["item_id"], 0) + line["qty"]
+        stock_ledger.apply_stock_changes(db, qty_by_item, stock_ledger.PURCHASE, purchase.id)
+
+        inv["purchase_id"] = purchase.id
+        queue_event(db, "purchases", "purchase.created", purchase_id=purchase.id, total=purchase.total)
+
+    bump_daily_stats(
+        db,
+        purchase_count=len(rows),
+        purchase_total=sum((r.total for r in rows), Decimal(0)),
+    )
+
+
+def import_supplier_invoices(db, invoices, default_supplier_id=None):
+    """
+    Post parsed supplier invoices (see app.services.supplier_invoice) as
+    purchases, INVOICE_IMPORT_CHUNK_SIZE at a time.
+
+    The supplier comes from the invoice GSTIN, falling back to
+    default_supplier_id. Invoices already posted for the same
+    (supplier_id, invoice_no) are skipped as duplicates. An invoice with
+    any unmatched or invalid line is rejected whole; each chunk commits
+    on its own. Returns counts plus a per-invoice error list.
+    """
+    report = {
+        "processed": 0,
+        "created": 0,
+        "duplicates": 0,
+        "failed": 0,
+        "purchase_ids": [],
+        "errors": [],
+    }
+    seen = set()
+
+    def fail(inv, message):
+        report["failed"] += 1
+        report["errors"].append(
+            {"source": inv["source"], "invoice_no": inv["invoice_no"], "error": message}
         )
 
-    purchase.total = total
+    for chunk in chunked(invoices, INVOICE_IMPORT_CHUNK_SIZE):
+        report["processed"] += len(chunk)
 
-    _safe_commit(db)
-    db.refresh(purchase)
+        for inv in chunk:
+            if not inv["invoice_no"] and not inv["errors"]:
+                inv["errors"].append("Missing invoice number")
+            if not inv["lines"] and not inv["errors"]:
+                inv["errors"].append("Invoice has no lines")
 
-    return purchase
+        _resolve_suppliers(db, chunk, default_supplier_id)
+        _match_lines(db, chunk)
+
+        candidates = []
+        for inv in chunk:
+            if inv["errors"]:
+                fail(inv, "; ".join(inv["errors"]))
+            else:
+                candidates.append(inv)
+
+        keys = {(inv["supplier_id"], inv["invoice_no"]) for inv in candidates}
+        if keys:
+            seen.update(
+                (r.supplier_id, r.invoice_no)
+                for r in db.query(Purchase.supplier_id, Purchase.invoice_no).filter(
+                    tuple_(Purchase.supplier_id, Purchase.invoice_no).in_(keys)
+                )
+            )
+
+        fresh = []
+        for inv in candidates:
+            key = (inv["supplier_id"], inv["invoice_no"])
+            if key in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(key)
+            fresh.append(inv)
+
+        if not fresh:
+            continue
+
+        try:
+            _post_invoices(db, fresh)
+            _safe_commit(db)
+        except (SQLAlchemyError, ValueError) as e:
+            # ValueError: a matched item was deleted before its stock update
+            db.rollback()
+            message = str(getattr(e, "orig", e)).strip()
+            for inv in fresh:
+                seen.discard((inv["supplier_id"], inv["invoice_no"]))
+                fail(inv, message)
+            continue
+
+        report["created"] += len(fresh)
+        report["purchase_ids"] += [inv["purchase_id"] for inv in fresh]
+
+    return report
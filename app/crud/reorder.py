@@ -0,0 +1,121 @@
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.models.all_models import Item, Sale, SaleItem
+
+
+# Same predicate as the ix_items_low_stock partial index; keep them in sync
+LOW_STOCK = Item.stock_qty <= Item.reorder_level
+
+
+def _summary_columns():
+    return (
+        Item.id,
+        Item.name,
+        Item.brand,
+        Item.model,
+        Item.barcode,
+        Item.category_id,
+        Item.supplier_name,
+        Item.stock_qty,
+        Item.reorder_level,
+    )
+
+
+# =========================================================
+# LOW STOCK
+# =========================================================
+def list_low_stock(db: Session):
+    return (
+        db.query(*_summary_columns())
+        .filter(LOW_STOCK)
+        .order_by(Item.id)
+        .all()
+    )
+
+
+# =========================================================
+# REORDER SUGGESTIONS
+# =========================================================
+def reorder_suggestions(
+    db: Session,
+    days: int = 30,
+    lead_days: int = 7,
+    cover_days: int = 30,
+):
+    """
+    Purchase list grouped by supplier.
+
+    Velocity is units sold per day over the last `days`. An item is
+    suggested when it is at/below reorder level or would run out within
+    `lead_days`; the quantity tops it up to `cover_days` of sales (and at
+    least above its reorder level).
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+
+    sold = (
+        db.query(
+            SaleItem.item_id.label("item_id"),
+            func.sum(SaleItem.qty).label("qty"),
+        )
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .filter(Sale.created_at >= since)
+        .group_by(SaleItem.item_id)
+        .subquery("sold")
+    )
+
+    sold_qty = func.coalesce(sold.c.qty, 0)
+
+    rows = (
+        db.query(*_summary_columns(), sold_qty.label("sold_qty"))
+        .outerjoin(sold, sold.c.item_id == Item.id)
+        .filter(
+            or_(
+                LOW_STOCK,
+                func.coalesce(Item.stock_qty, 0) * days < sold_qty * lead_days,
+            )
+        )
+        .all()
+    )
+
+    by_supplier = {}
+
+    for r in rows:
+        stock = r.stock_qty or 0
+        velocity = float(r.sold_qty) / days
+        target = max((r.reorder_level or 0) + 1, math.ceil(velocity * cover_days))
+        suggested = target - stock
+        if suggested <= 0:
+            continue
+
+        supplier = r.supplier_name or "Unassigned"
+        by_supplier.setdefault(supplier, []).append({
+            "item_id": r.id,
+            "name": r.name,
+            "brand": r.brand,
+            "model": r.model,
+            "barcode": r.barcode,
+            "stock_qty": stock,
+            "reorder_level": r.reorder_level,
+            "sold_last_period": int(r.sold_qty),
+            "daily_velocity": round(velocity, 2),
+            "days_of_cover": round(stock / velocity, 1) if velocity else None,
+            "suggested_qty": suggested,
+        })
+
+    return [
+        {
+            "supplier_name": supplier,
+            "item_count": len(lines),
+            "total_qty": sum(line["suggested_qty"] for line in lines),
+            # items with no recent sales have no cover figure; list them last
+            "items": sorted(
+                lines,
+                key=lambda line: (line["days_of_cover"] is None, line["days_of_cover"] or 0),
+            ),
+        }
+        for supplier, lines in sorted(by_supplier.items())
+    ]
@@ -1,8 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from decimal import Decimal
 
+from sqlalchemy import tuple_
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.models.all_models import (
     Sale,
@@ -10,6 +11,10 @@ from app.models.all_models import (
     Payment,
     Item,
 )
+from app.crud.pagination import decode_cursor, encode_cursor
+from app.services.daily_stats import bump_daily_stats
+from app.services.events import queue_event
+from app.services import stock_ledger
 
 
 def _safe_commit(db: Session) -> None:
@@ -20,6 +25,21 @@ def _safe_commit(db: Session) -> None:
         raise
 
 
+def _lock_items(db: Session, item_ids):
+    """
+    Load all cart items in one round trip and take row locks on them.
+    Rows are locked in id order so concurrent checkouts cannot deadlock.
+    """
+    rows = (
+        db.query(Item)
+        .filter(Item.id.in_(item_ids))
+        .order_by(Item.id)
+        .with_for_update()
+        .all()
+    )
+    return {item.id: item for item in rows}
+
+
 # =========================================================
 # CREATE SALE
 # =========================================================
@@ -38,18 +58,27 @@ def create_sale(db: Session, data, user_id: int):
     calculated_rows = []
 
     # =====================================================
-    # STEP 1: VALIDATE ITEMS & CALCULATE GST
+    # STEP 1: LOCK ITEMS, VALIDATE STOCK & CALCULATE GST
     # =====================================================
+    qty_by_item = {}
     for row in data.items:
+        qty_by_item[row.item_id] = qty_by_item.get(row.item_id, 0) + row.qty
+
+    items = _lock_items(db, qty_by_item.keys())
 
-        item = db.query(Item).get(row.item_id)
+    for item_id, qty in qty_by_item.items():
+        item = items.get(item_id)
 
         if not item:
             raise Exception("Item not found")
 
-        if item.stock_qty < row.qty:
+        if (item.stock_qty or 0) < qty:
             raise Exception(f"Insufficient stock for {item.name}")
 
+    for row in data.items:
+
+        item = items[row.item_id]
+
         taxable_value = Decimal(row.price) * Decimal(row.qty)
 
         gst_rate = item.gst_percent or Decimal("0.00")
@@ -129,8 +158,19 @@ def create_sale(db: Session, data, user_id: int):
 
         db.add(sale_item)
 
-        # deduct stock
-        item.stock_qty -= row.qty
+    # deduct stock through the ledger (guarded, so a concurrent sale can never oversell)
+    try:
+        stock_ledger.apply_stock_changes(
+            db,
+            {item_id: -qty for item_id, qty in qty_by_item.items()},
+            stock_ledger.SALE,
+            sale.id,
+            require_available=True,
+        )
+    except stock_ledger.InsufficientStock as e:
+        name = items[min(e.item_ids)].name
+        db.rollback()
+        raise Exception(f"Insufficient stock for {name}")
 
     # =====================================================
     # STEP 4: RECORD PAYMENT
@@ -145,6 +185,15 @@ def create_sale(db: Session, data, user_id: int):
         )
         db.add(payment)
 
+    bump_daily_stats(
+        db,
+        sales_count=1,
+        sales_total=total,
+        collected_total=Decimal(amt or 0),
+    )
+
+    queue_event(db, "sales", "sale.created", sale_id=sale.id, total=total)
+
     # =====================================================
     # STEP 5: COMMIT
     # =====================================================
@@ -158,11 +207,115 @@ def create_sale(db: Session, data, user_id: int):
 # =========================================================
 # GET SALE
 # =========================================================
+def sale_detail_options():
+    """
+    Loader options for everything a sale detail or invoice touches,
+    so the cost is a fixed number of queries regardless of line count.
+    """
+    return (
+        selectinload(Sale.items).joinedload(SaleItem.item),
+        selectinload(Sale.payments),
+        selectinload(Sale.prescriptions),
+        selectinload(Sale.lens_orders),
+    )
+
+
 def get_sale(db: Session, sale_id: int):
     """
-    Fetch full sale including items and payments
+    Fetch full sale including items (with their Item), payments,
+    prescriptions and lens orders
     """
-    return db.query(Sale).get(sale_id)
+    return (
+        db.query(Sale)
+        .options(*sale_detail_options())
+        .filter(Sale.id == sale_id)
+        .first()
+    )
+
+
+def iter_sale_batches(db: Session, date_from, date_to, batch_size: int = 200):
+    """
+    Yield fully loaded sales created within [date_from, date_to] in id
+    order, batch_size at a time. The session is cleared between batches
+    so memory stays bounded for long ranges.
+    """
+    last_id = 0
+
+    while True:
+        batch = (
+            db.query(Sale)
+            .options(*sale_detail_options())
+            .filter(Sale.created_at >= date_from)
+            .filter(Sale.created_at < date_to + timedelta(days=1))
+            .filter(Sale.id > last_id)
+            .order_by(Sale.id)
+            .limit(batch_size)
+            .all()
+        )
+
+        if not batch:
+            return
+
+        last_id = batch[-1].id
+        yield batch
+        db.expunge_all()
+
+
+# =========================================================
+# LIST SALES (KEYSET PAGINATED)
+# =========================================================
+def list_sales(
+    db: Session,
+    limit: int | None = None,
+    cursor: str | None = None,
+    date_from=None,
+    date_to=None,
+    payment_status: str | None = None,
+    delivery_status: str | None = None,
+):
+    """
+    Newest-first sales page as lightweight column rows.
+    Keyset on (created_at, id) so every page is an index range scan.
+    Without a limit every matching sale is returned.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    query = db.query(
+        Sale.id,
+        Sale.total,
+        Sale.status,
+        Sale.payment_status,
+        Sale.delivery_status,
+        Sale.created_at,
+    )
+
+    if date_from:
+        query = query.filter(Sale.created_at >= date_from)
+    if date_to:
+        query = query.filter(Sale.created_at < date_to + timedelta(days=1))
+    if payment_status:
+        query = query.filter(Sale.payment_status == payment_status)
+    if delivery_status:
+        query = query.filter(Sale.delivery_status == delivery_status)
+
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Sale.created_at, Sale.id) < tuple_(after_created_at, after_id)
+        )
+
+    query = query.order_by(Sale.created_at.desc(), Sale.id.desc())
+    if limit:
+        query = query.limit(limit + 1)
+
+    rows = query.all()
+
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return rows, next_cursor
 
 
 # =========================================================
@@ -178,6 +331,7 @@ def deliver_sale(db: Session, sale_id: int, balance_payment_mode: str):
     if not sale:
         return None
     bal = Decimal(str(getattr(sale, "balance_amount", 0) or 0))
+    was_delivered = sale.delivery_status == "delivered"
     sale.balance_payment_mode = balance_payment_mode
     sale.balance_payment_date = datetime.utcnow()
     sale.payment_status = "paid"
@@ -187,6 +341,13 @@ def deliver_sale(db: Session, sale_id: int, balance_payment_mode: str):
     sale.paid = (sale.paid or Decimal("0")) + bal
     if bal > 0:
         db.add(Payment(sale_id=sale_id, amount=bal, method=balance_payment_mode))
+    # bucketed the way rebuild_daily_stats reads them: the payment by the
+    # database day of payments.created_at, the delivery by the day of
+    # balance_payment_date; a repeat call adds no second delivery
+    bump_daily_stats(db, collected_total=bal)
+    if not was_delivered:
+        bump_daily_stats(db, day=sale.balance_payment_date.date(), delivered_count=1)
+    queue_event(db, "sales", "sale.delivered", sale_id=sale_id, collected=bal)
     _safe_commit(db)
     db.refresh(sale)
     return sale
@@ -11,7 +11,14 @@ from app.api.supplier import router as supplier_router
 from app.api.dashboard import router as dashboard_router
 from app.api.prescriptions import router as rx_router
 from app.api.categories import router as categories_router
+from app.api.events import router as events_router
+from app.core.config import LENS_STATS_REFRESH_SECONDS, STOCK_SNAPSHOT_CHECK_SECONDS
 from app.core.database import engine
+from app.core.security import shutdown_password_pool
+from app.services import lens_stats, stock_ledger
+from app.services.events import broker
+from app.services.invoice_pdf import shutdown_render_pool
+from app.services.scheduler import scheduler
 
 
 app = FastAPI(title="Optical POS API")
@@ -23,6 +30,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Deleted-Ids"],
 )
 
 # ---------- Root ----------
@@ -40,6 +48,11 @@ app.include_router(purchase_router)
 app.include_router(supplier_router)
 app.include_router(dashboard_router)
 app.include_router(rx_router)
+app.include_router(events_router)
+
+# ---------- Background jobs ----------
+scheduler.every(LENS_STATS_REFRESH_SECONDS, lens_stats.refresh_job, "supplier-lens-stats")
+scheduler.every(STOCK_SNAPSHOT_CHECK_SECONDS, stock_ledger.snapshot_job, "stock-snapshot")
 
 
 # ---------- Lifecycle ----------
@@ -57,6 +70,9 @@ def on_startup() -> None:
         # Keeping behavior non-fatal here to avoid breaking deployments.
         pass
 
+    broker.start()
+    scheduler.start()
+
 
 @app.on_event("shutdown")
 def on_shutdown() -> None:
@@ -68,3 +84,8 @@ def on_shutdown() -> None:
     except Exception:
         pass
 
+    scheduler.stop()
+    shutdown_password_pool()
+    shutdown_render_pool()
+    broker.stop()
+
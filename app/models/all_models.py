@@ -1,9 +1,9 @@
 from sqlalchemy import (
     Column, Integer, String, Boolean, Text, Numeric,
-    ForeignKey, Date, TIMESTAMP
+    ForeignKey, Date, TIMESTAMP, Index, JSON, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.core.database import Base
 
@@ -86,6 +86,28 @@ class Category(Base):
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        # Scanner lookups; blank barcodes are allowed to repeat
+        Index(
+            "ux_items_barcode",
+            "barcode",
+            unique=True,
+            postgresql_where=text("barcode IS NOT NULL AND barcode <> ''"),
+        ),
+        # Delta sync and catalogue filters on GET /items
+        Index("ix_items_updated_at_id", "updated_at", "id"),
+        Index("ix_items_category_id", "category_id"),
+        Index("ix_items_brand", "brand"),
+        Index("ix_items_hsn_code", "hsn_code"),
+        Index("ix_items_supplier_name", "supplier_name"),
+        Index("ix_items_model", "model"),
+        # Low-stock list / dashboard count (predicate must match the query)
+        Index(
+            "ix_items_low_stock",
+            "id",
+            postgresql_where=text("stock_qty <= reorder_level"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(200))
@@ -114,16 +136,78 @@ class Item(Base):
     stock_qty = Column(Integer)
     reorder_level = Column(Integer)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    # clock_timestamp(), not now(): now() is the transaction start, which
+    # can be well before commit for an import chunk or a locked sale
+    updated_at = Column(
+        TIMESTAMP,
+        server_default=func.clock_timestamp(),
+        onupdate=func.clock_timestamp(),
+    )
 
     category = relationship("Category", back_populates="items")
 
 
+class ItemDeletion(Base):
+    """
+    Tombstone for a deleted item, so catalogue delta sync can tell
+    terminals to drop it. No FK: the item row is gone.
+    """
+    __tablename__ = "item_deletions"
+    __table_args__ = (
+        Index("ix_item_deletions_deleted_at", "deleted_at"),
+    )
+
+    item_id = Column(Integer, primary_key=True)
+    deleted_at = Column(TIMESTAMP, server_default=func.clock_timestamp())
+
+
+class PriceRevision(Base):
+    """
+    Audit header for a bulk price / GST revision: the filter and rule
+    that were applied, by whom, and how many items changed.
+    """
+    __tablename__ = "price_revisions"
+
+    id = Column(Integer, primary_key=True)
+    filters = Column(JSON)
+    rule = Column(JSON)
+    affected_count = Column(Integer)
+    note = Column(Text, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+    items = relationship("PriceRevisionItem", back_populates="revision")
+
+
+class PriceRevisionItem(Base):
+    __tablename__ = "price_revision_items"
+
+    id = Column(Integer, primary_key=True)
+    revision_id = Column(Integer, ForeignKey("price_revisions.id"), index=True)
+    item_id = Column(Integer, ForeignKey("items.id"), index=True)
+
+    old_price = Column(Numeric)
+    new_price = Column(Numeric)
+    old_gst_percent = Column(Numeric)
+    new_gst_percent = Column(Numeric)
+
+    revision = relationship("PriceRevision", back_populates="items")
+
+
 # =========================================================
 # INVENTORY
 # =========================================================
 
 class StockMovement(Base):
+    """
+    Append-only stock ledger. Every change to Item.stock_qty goes through
+    app.services.stock_ledger, which writes one row per item.
+    """
     __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index("ix_stock_movements_item_id_created_at", "item_id", "created_at"),
+        Index("ix_stock_movements_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     item_id = Column(Integer, ForeignKey("items.id"))
@@ -133,12 +217,35 @@ class StockMovement(Base):
     created_at = Column(TIMESTAMP, server_default=func.now())
 
 
+class StockSnapshot(Base):
+    """
+    Per-item balance at the end of snapshot_date. Movements with
+    created_at >= cutoff_at are not included.
+    """
+    __tablename__ = "stock_snapshots"
+    __table_args__ = (
+        UniqueConstraint("item_id", "snapshot_date", name="uq_stock_snapshots_item_date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=False)
+    snapshot_date = Column(Date, nullable=False, index=True)
+    cutoff_at = Column(TIMESTAMP, nullable=False)
+    qty = Column(Integer, nullable=False)
+    cost_price = Column(Numeric)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+
 # =========================================================
 # PURCHASES
 # =========================================================
 
 class Purchase(Base):
     __tablename__ = "purchases"
+    __table_args__ = (
+        Index("ix_purchases_created_at", "created_at"),
+        Index("ix_purchases_supplier_id_invoice_no", "supplier_id", "invoice_no"),
+    )
 
     id = Column(Integer, primary_key=True)
     supplier_id = Column(Integer, ForeignKey("suppliers.id"))
@@ -173,6 +280,14 @@ from sqlalchemy import TIMESTAMP
 
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (
+        # Keyset pagination + date range filters on /sales
+        Index("ix_sales_created_at_id", "created_at", "id"),
+        Index("ix_sales_payment_status_created_at", "payment_status", "created_at"),
+        Index("ix_sales_delivery_status_created_at", "delivery_status", "created_at"),
+        Index("ix_sales_customer_phone", "customer_phone"),
+        Index("ix_sales_customer_id", "customer_id"),
+    )
 
     id = Column(Integer, primary_key=True)
 
@@ -238,8 +353,8 @@ class SaleItem(Base):
 
     id = Column(Integer, primary_key=True)
 
-    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
-    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False, index=True)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False, index=True)
 
     qty = Column(Integer, nullable=False)
     price = Column(Numeric(10, 2), nullable=False)
@@ -336,16 +451,53 @@ class Delivery(Base):
     delivered_at = Column(TIMESTAMP)
 
 
+# =========================================================
+# REPORTING ROLLUPS
+# =========================================================
+
+class DailyStoreStats(Base):
+    """
+    One row per calendar day, maintained in the same transaction as the
+    sale / delivery / return / purchase that changes it.
+    """
+    __tablename__ = "daily_store_stats"
+
+    day = Column(Date, primary_key=True)
+
+    sales_count = Column(Integer, nullable=False, server_default="0")
+    sales_total = Column(Numeric(14, 2), nullable=False, server_default="0")
+    collected_total = Column(Numeric(14, 2), nullable=False, server_default="0")
+    delivered_count = Column(Integer, nullable=False, server_default="0")
+
+    returns_count = Column(Integer, nullable=False, server_default="0")
+    refund_total = Column(Numeric(14, 2), nullable=False, server_default="0")
+
+    purchase_count = Column(Integer, nullable=False, server_default="0")
+    purchase_total = Column(Numeric(14, 2), nullable=False, server_default="0")
+
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
 # =========================================================
 # PRESCRIPTIONS
 # =========================================================
 
 class Prescription(Base):
     __tablename__ = "prescriptions"
+    __table_args__ = (
+        Index("ix_prescriptions_sale_id", "sale_id"),
+        Index("ix_prescriptions_customer_id", "customer_id"),
+        Index("ix_prescriptions_created_at_id", "created_at", "id"),
+        # power-range recall search, one index per eye
+        Index("ix_prescriptions_sphere_r_cyl_r", "sphere_r", "cyl_r"),
+        Index("ix_prescriptions_sphere_l_cyl_l", "sphere_l", "cyl_l"),
+    )
 
     id = Column(Integer, primary_key=True)
 
     sale_id = Column(Integer, ForeignKey("sales.id"))
+    # set for Rx recorded without a sale (e.g. imported history)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
 
     sphere_r = Column(Numeric)
     cyl_r = Column(Numeric)
@@ -375,6 +527,21 @@ class Prescription(Base):
 
 class LensOrder(Base):
     __tablename__ = "lens_orders"
+    __table_args__ = (
+        Index("ix_lens_orders_status_order_date", "status", "order_date"),
+        # board paging keyset (expression must match crud.lens._order_day)
+        Index(
+            "ix_lens_orders_order_day_id",
+            text("coalesce(order_date, (created_at)::date)"),
+            "id",
+        ),
+        # overdue / due-soon scan (predicate must match the query)
+        Index(
+            "ix_lens_orders_open_expected_date",
+            "expected_date",
+            postgresql_where=text("status <> 'DELIVERED'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
 
@@ -425,3 +592,26 @@ class LensOrderStatusLog(Base):
     changed_by = Column(Integer, ForeignKey("users.id"))
 
     order = relationship("LensOrder", back_populates="logs")
+
+
+class SupplierLensStats(Base):
+    """
+    Per-supplier lens turnaround, precomputed from lens_order_status_log
+    by the background scheduler (app.services.lens_stats).
+    """
+    __tablename__ = "supplier_lens_stats"
+
+    supplier_id = Column(
+        Integer, ForeignKey("suppliers.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    completed_count = Column(Integer, nullable=False, server_default="0")
+    avg_turnaround_days = Column(Numeric(8, 2))
+    p90_turnaround_days = Column(Numeric(8, 2))
+    on_time_count = Column(Integer, nullable=False, server_default="0")
+    late_count = Column(Integer, nullable=False, server_default="0")
+
+    open_count = Column(Integer, nullable=False, server_default="0")
+    overdue_count = Column(Integer, nullable=False, server_default="0")
+
+    computed_at = Column(TIMESTAMP, server_default=func.now())
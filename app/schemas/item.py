@@ -1,6 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel
 
@@ -63,6 +63,19 @@ class ItemSearchOut(BaseModel):
         from_attributes = True
 
 
+class ItemBarcodeOut(BaseModel):
+    """Scanner lookup result. Stock is left out: it changes on every sale
+    and is re-checked when the sale is created."""
+    id: int
+    name: str
+    barcode: str
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    hsn_code: Optional[str] = None
+    selling_price: Optional[Decimal] = None
+    gst_percent: Optional[Decimal] = None
+
+
 class ItemOut(BaseModel):
     id: int
     name: str
@@ -84,6 +97,7 @@ class ItemOut(BaseModel):
     selling_price: Optional[Decimal] = None
     gst_percent: Optional[Decimal] = None
     stock_qty: int
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -110,3 +124,24 @@ class ItemUpdate(BaseModel):
     gst_percent: Optional[Decimal] = None
     stock_qty: Optional[int] = None
 
+
+# ---------- BULK PRICE REVISION ----------
+class PriceRevisionFilter(BaseModel):
+    category_id: Optional[int] = None
+    brand: Optional[str] = None
+    hsn_code: Optional[str] = None
+    supplier_name: Optional[str] = None
+
+
+class PriceRevisionRule(BaseModel):
+    field: Optional[Literal["selling_price", "purchase_price"]] = None
+    mode: Literal["percent", "absolute"] = "percent"
+    value: Optional[Decimal] = None
+    gst_percent: Optional[Decimal] = None
+
+
+class PriceRevisionIn(BaseModel):
+    filter: PriceRevisionFilter = PriceRevisionFilter()
+    rule: PriceRevisionRule
+    dry_run: bool = True
+    note: Optional[str] = None
@@ -1,25 +1,14 @@
 from pydantic import BaseModel
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
+
+from app.schemas.prescription import PrescriptionBase
 
 
 # ---------- PRESCRIPTION ----------
-class PrescriptionCreate(BaseModel):
+class PrescriptionCreate(PrescriptionBase):
     sale_id: int
 
-    sphere_r: Optional[Decimal] = None
-    cyl_r: Optional[Decimal] = None
-    axis_r: Optional[int] = None
-    add_r: Optional[Decimal] = None
-
-    sphere_l: Optional[Decimal] = None
-    cyl_l: Optional[Decimal] = None
-    axis_l: Optional[int] = None
-    add_l: Optional[Decimal] = None
-
-    pd: Optional[Decimal] = None
-    notes: Optional[str] = None
-
 
 # ---------- LENS ORDER ----------
 from pydantic import BaseModel
@@ -46,3 +35,13 @@ class LensOrderCreate(BaseModel):
 
 class StatusUpdate(BaseModel):
     status: str
+
+
+class BulkStatusUpdate(BaseModel):
+    order_ids: List[int]
+    status: str
+
+
+class BatchReceive(BaseModel):
+    # scanned order labels, e.g. "LO-000123"
+    codes: List[str]
@@ -0,0 +1,113 @@
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+
+from pydantic import BaseModel, field_validator, model_validator
+
+
+DIOPTER_STEP = Decimal("0.25")
+
+
+def _blank_to_none(value):
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+def _to_quarter(value: Decimal) -> Decimal:
+    """Round a diopter value to the nearest 0.25 D."""
+    steps = (value / DIOPTER_STEP).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    return (steps * DIOPTER_STEP).quantize(Decimal("0.01"))
+
+
+class PrescriptionBase(BaseModel):
+    """
+    Validated Rx values: sphere / cyl / add are normalised to 0.25 D
+    steps, axis must be 0-180 and is required whenever cyl is non-zero.
+    Blank strings from forms are treated as missing.
+    """
+    sphere_r: Optional[Decimal] = None
+    cyl_r: Optional[Decimal] = None
+    axis_r: Optional[int] = None
+    add_r: Optional[Decimal] = None
+
+    sphere_l: Optional[Decimal] = None
+    cyl_l: Optional[Decimal] = None
+    axis_l: Optional[int] = None
+    add_l: Optional[Decimal] = None
+
+    pd: Optional[Decimal] = None
+    notes: Optional[str] = None
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def blank_is_none(cls, value):
+        return _blank_to_none(value)
+
+    @field_validator("sphere_r", "sphere_l")
+    @classmethod
+    def check_sphere(cls, value):
+        if value is None:
+            return value
+        if not Decimal("-30") <= value <= Decimal("30"):
+            raise ValueError("sphere must be between -30.00 and +30.00")
+        return _to_quarter(value)
+
+    @field_validator("cyl_r", "cyl_l")
+    @classmethod
+    def check_cyl(cls, value):
+        if value is None:
+            return value
+        if not Decimal("-10") <= value <= Decimal("10"):
+            raise ValueError("cyl must be between -10.00 and +10.00")
+        return _to_quarter(value)
+
+    @field_validator("add_r", "add_l")
+    @classmethod
+    def check_add(cls, value):
+        if value is None:
+            return value
+        if not Decimal("0") <= value <= Decimal("4"):
+            raise ValueError("add must be between 0.00 and +4.00")
+        return _to_quarter(value)
+
+    @field_validator("axis_r", "axis_l")
+    @classmethod
+    def check_axis(cls, value):
+        if value is not None and not 0 <= value <= 180:
+            raise ValueError("axis must be between 0 and 180")
+        return value
+
+    @field_validator("pd")
+    @classmethod
+    def check_pd(cls, value):
+        if value is not None and not Decimal("20") <= value <= Decimal("90"):
+            raise ValueError("pd must be between 20 and 90 mm")
+        return value
+
+    @model_validator(mode="after")
+    def axis_with_cyl(self):
+        for eye in ("r", "l"):
+            cyl = getattr(self, f"cyl_{eye}")
+            if cyl and getattr(self, f"axis_{eye}") is None:
+                raise ValueError(f"axis_{eye} is required when cyl_{eye} is set")
+        return self
+
+
+class PrescriptionIn(PrescriptionBase):
+    sale_id: Optional[int] = None
+    customer_id: Optional[int] = None
+
+
+class PrescriptionImportRow(PrescriptionBase):
+    """One row of a refraction-equipment export."""
+    sale_id: Optional[int] = None
+    phone: Optional[str] = None
+    customer_name: Optional[str] = None
+    recorded_at: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def has_owner(self):
+        if self.sale_id is None and not self.phone:
+            raise ValueError("each row needs a sale_id or a phone number")
+        return self
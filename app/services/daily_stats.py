@@ -0,0 +1,222 @@
+import argparse
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.all_models import DailyStoreStats, Payment, Purchase, Sale
+
+
+COUNTER_COLUMNS = (
+    "sales_count",
+    "sales_total",
+    "collected_total",
+    "delivered_count",
+    "returns_count",
+    "refund_total",
+    "purchase_count",
+    "purchase_total",
+)
+
+# refund_total / returns_count are only known from the live write path,
+# so a rebuild leaves them untouched
+REBUILDABLE_COLUMNS = (
+    "sales_count",
+    "sales_total",
+    "collected_total",
+    "delivered_count",
+    "purchase_count",
+    "purchase_total",
+)
+
+
+# =========================================================
+# INCREMENTAL UPDATE
+# =========================================================
+def bump_daily_stats(db: Session, day: date | None = None, **deltas) -> None:
+    """
+    Add deltas to the day's rollup row with a single upsert.
+
+    `day` defaults to the database's current_date, the same day
+    rebuild_daily_stats derives from server-default created_at columns,
+    so live counters and a rebuild bucket activity identically.
+    Does not commit: callers run it inside their own transaction.
+    """
+    deltas = {k: v for k, v in deltas.items() if v}
+    unknown = set(deltas) - set(COUNTER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown stats columns: {sorted(unknown)}")
+    if not deltas:
+        return
+
+    stmt = pg_insert(DailyStoreStats).values(day=day or func.current_date(), **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyStoreStats.day],
+        set_={
+            **{
+                name: getattr(DailyStoreStats, name) + stmt.excluded[name]
+                for name in deltas
+            },
+            "updated_at": func.now(),
+        },
+    )
+
+    db.execute(stmt)
+
+
+# =========================================================
+# TREND QUERY
+# =========================================================
+def get_trend(db: Session, date_from: date, date_to: date, granularity: str = "day"):
+    """
+    Rollup rows between date_from and date_to (inclusive), optionally
+    summed per ISO week or month.
+    """
+    if granularity not in ("day", "week", "month"):
+        raise ValueError("granularity must be day, week or month")
+
+    if granularity == "day":
+        bucket = DailyStoreStats.day
+    else:
+        bucket = func.date(func.date_trunc(granularity, DailyStoreStats.day))
+
+    rows = (
+        db.query(
+            bucket.label("period"),
+            *[
+                func.sum(getattr(DailyStoreStats, name)).label(name)
+                for name in COUNTER_COLUMNS
+            ],
+        )
+        .filter(DailyStoreStats.day >= date_from)
+        .filter(DailyStoreStats.day <= date_to)
+        .group_by(bucket)
+        .order_by(bucket)
+        .all()
+    )
+
+    return [
+        {
+            "period": r.period.isoformat(),
+            **{
+                name: (
+                    float(getattr(r, name) or 0)
+                    if name.endswith("_total")
+                    else int(getattr(r, name) or 0)
+                )
+                for name in COUNTER_COLUMNS
+            },
+        }
+        for r in rows
+    ]
+
+
+# =========================================================
+# BACKFILL / REBUILD
+# =========================================================
+def _grouped(db: Session, day_col, aggregates, *filters):
+    query = db.query(func.date(day_col).label("day"), *aggregates)
+    for f in filters:
+        query = query.filter(f)
+    return query.group_by(func.date(day_col)).all()
+
+
+def rebuild_daily_stats(db: Session, date_from: date | None = None, date_to: date | None = None) -> int:
+    """
+    Recompute the rebuildable columns from sales, payments and purchases
+    for the given range (whole history when omitted). Returns the number
+    of days written.
+    """
+    def in_range(col):
+        filters = []
+        if date_from:
+            filters.append(col >= datetime.combine(date_from, time.min))
+        if date_to:
+            filters.append(col < datetime.combine(date_to + timedelta(days=1), time.min))
+        return filters
+
+    days = {}
+
+    def row_for(day):
+        return days.setdefault(day, {name: 0 for name in REBUILDABLE_COLUMNS})
+
+    for r in _grouped(
+        db, Sale.created_at,
+        [func.count(Sale.id).label("n"), func.coalesce(func.sum(Sale.total), 0).label("amt")],
+        *in_range(Sale.created_at),
+    ):
+        row_for(r.day).update(sales_count=r.n, sales_total=Decimal(r.amt))
+
+    for r in _grouped(
+        db, Payment.created_at,
+        [func.coalesce(func.sum(Payment.amount), 0).label("amt")],
+        *in_range(Payment.created_at),
+    ):
+        row_for(r.day)["collected_total"] = Decimal(r.amt)
+
+    for r in _grouped(
+        db, Sale.balance_payment_date,
+        [func.count(Sale.id).label("n")],
+        Sale.delivery_status == "delivered",
+        *in_range(Sale.balance_payment_date),
+    ):
+        row_for(r.day)["delivered_count"] = r.n
+
+    for r in _grouped(
+        db, Purchase.created_at,
+        [func.count(Purchase.id).label("n"), func.coalesce(func.sum(Purchase.total), 0).label("amt")],
+        *in_range(Purchase.created_at),
+    ):
+        row_for(r.day).update(purchase_count=r.n, purchase_total=Decimal(r.amt))
+
+    # zero out days in range that no longer have activity
+    reset = update(DailyStoreStats).values(
+        **{name: 0 for name in REBUILDABLE_COLUMNS}
+    )
+    if date_from:
+        reset = reset.where(DailyStoreStats.day >= date_from)
+    if date_to:
+        reset = reset.where(DailyStoreStats.day <= date_to)
+    db.execute(reset)
+
+    if days:
+        stmt = pg_insert(DailyStoreStats).values(
+            [{"day": day, **values} for day, values in days.items()]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyStoreStats.day],
+            set_={
+                **{name: stmt.excluded[name] for name in REBUILDABLE_COLUMNS},
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+
+    db.commit()
+    return len(days)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain the daily_store_stats rollup")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = sub.add_parser("rebuild", help="Backfill / rebuild rollup rows")
+    rebuild.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    rebuild.add_argument("--to", dest="date_to", type=date.fromisoformat)
+
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        written = rebuild_daily_stats(db, args.date_from, args.date_to)
+        print(f"daily_store_stats: {written} day(s) rebuilt")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import EVENTS_REDIS_URL
+from app.core.database import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+REDIS_CHANNEL = "optical_pos:events"
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+# =========================================================
+# IN-PROCESS BROADCASTER
+# =========================================================
+class EventBroker:
+    """
+    Fans events out to every connected SSE client in this process.
+
+    publish() may be called from any thread (sync endpoints run in the
+    threadpool); delivery hops onto each subscriber's event loop. When
+    EVENTS_REDIS_URL is set, events go through Redis pub/sub instead so
+    every worker process sees them.
+    """
+
+    def __init__(self, redis_url: str | None = None):
+        self._redis_url = redis_url
+        self._redis = None
+        self._listener = None
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    # ---------- lifecycle ----------
+    def start(self) -> None:
+        if not self._redis_url or self._listener is not None:
+            return
+        try:
+            import redis
+        except ImportError:
+            logger.warning("EVENTS_REDIS_URL is set but redis is not installed; using in-process events")
+            self._redis_url = None
+            return
+
+        self._redis = redis.Redis.from_url(self._redis_url)
+        self._listener = threading.Thread(
+            target=self._listen_redis, name="events-redis", daemon=True
+        )
+        self._listener.start()
+
+    def stop(self) -> None:
+        if self._redis is not None:
+            try:
+                self._redis.close()
+            except Exception:
+                pass
+        self._redis = None
+        self._listener = None
+
+    def _listen_redis(self) -> None:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(REDIS_CHANNEL)
+        try:
+            for message in pubsub.listen():
+                try:
+                    self._fan_out(json.loads(message["data"]))
+                except Exception:
+                    logger.exception("Dropping malformed event")
+        except Exception:
+            # connection closed on shutdown
+            pass
+
+    # ---------- subscribe ----------
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    # ---------- publish ----------
+    def publish(self, evt: dict) -> None:
+        if self._redis is not None:
+            try:
+                self._redis.publish(REDIS_CHANNEL, json.dumps(evt, default=str))
+                return
+            except Exception:
+                logger.exception("Redis publish failed; delivering locally")
+        self._fan_out(evt)
+
+    def _fan_out(self, evt: dict) -> None:
+        with self._lock:
+            targets = list(self._subscribers.items())
+        for queue, loop in targets:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, evt)
+            except RuntimeError:
+                # loop already closed
+                self.unsubscribe(queue)
+
+
+def _offer(queue: asyncio.Queue, evt: dict) -> None:
+    # slow clients lose the oldest events rather than growing unbounded
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(evt)
+
+
+broker = EventBroker(EVENTS_REDIS_URL)
+
+
+# =========================================================
+# TRANSACTIONAL PUBLISHING
+# =========================================================
+def queue_event(db: Session, topic: str, type: str, **payload) -> None:
+    """
+    Stage an event on the session; it is published only if the
+    surrounding transaction commits.
+    """
+    db.info.setdefault("pending_events", []).append(
+        {
+            "topic": topic,
+            "type": type,
+            "at": datetime.utcnow().isoformat(),
+            **payload,
+        }
+    )
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_pending(session) -> None:
+    for evt in session.info.pop("pending_events", []):
+        try:
+            broker.publish(evt)
+        except Exception:
+            logger.exception("Event publish failed")
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending(session) -> None:
+    session.info.pop("pending_events", None)
+
+
+# =========================================================
+# SSE FORMATTING
+# =========================================================
+async def sse_stream(is_disconnected, topics: set[str] | None = None, keepalive: float = 15.0):
+    """
+    Async generator of Server-Sent Events for one client. Idle clients
+    only receive a comment line every `keepalive` seconds.
+    """
+    queue = broker.subscribe()
+    try:
+        yield "retry: 5000\n\n"
+
+        while True:
+            if await is_disconnected():
+                break
+
+            try:
+                evt = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            if topics and evt.get("topic") not in topics:
+                continue
+
+            yield f"event: {evt['type']}\ndata: {json.dumps(evt, default=str)}\n\n"
+    finally:
+        broker.unsubscribe(queue)
@@ -0,0 +1,63 @@
+import zipfile
+
+from app.core.database import SessionLocal
+from app.crud.sales import iter_sale_batches
+from app.services.invoice_pdf import invoice_snapshot, render_invoice_batch
+
+
+EXPORT_BATCH_SIZE = 200
+
+
+class _ChunkSink:
+    """
+    Write-only file object for zipfile. Written bytes are collected
+    until drained, so the archive can be streamed as it is built.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_invoice_zip(date_from, date_to):
+    """
+    Generator of ZIP bytes holding one invoice PDF per sale in the range.
+    Sales are loaded in eager batches and each batch is rendered in
+    parallel on the export pool, separate from the one serving single
+    invoice reprints, before being written out.
+    """
+    sink = _ChunkSink()
+    db = SessionLocal()
+
+    try:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+
+            for batch in iter_sale_batches(db, date_from, date_to, EXPORT_BATCH_SIZE):
+
+                snapshots = [invoice_snapshot(sale) for sale in batch]
+
+                for snapshot, pdf_bytes in zip(snapshots, render_invoice_batch(snapshots)):
+                    zf.writestr(f"invoice_{snapshot.id}.pdf", pdf_bytes)
+
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+
+        # central directory
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+
+    finally:
+        db.close()
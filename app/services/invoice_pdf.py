@@ -1,4 +1,14 @@
+import glob
+import hashlib
+import json
+import multiprocessing
 import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from types import SimpleNamespace
+
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
@@ -7,6 +17,13 @@ from reportlab.platypus import Table, TableStyle, Paragraph
 from reportlab.lib.enums import TA_LEFT, TA_RIGHT
 from reportlab.lib import colors
 
+from app.core.config import (
+    INVOICE_CACHE_MAX_BYTES,
+    INVOICE_CACHE_MAX_FILES,
+    INVOICE_EXPORT_WORKERS,
+    INVOICE_RENDER_WORKERS,
+)
+
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 PDF_DIR = os.path.join(BASE_DIR, "invoices")
 
@@ -18,12 +35,247 @@ CLINIC_ADDRESS = "Address Line 1, City"
 CLINIC_PHONE = "Phone: 9999999999"
 CLINIC_GSTIN = "GSTIN: 32XXXXXXXXXXX"
 
+# Bump when the layout changes so cached invoices are re-rendered
+INVOICE_LAYOUT_VERSION = 1
+
+
+# ================= CACHE =================
+
+def _fmt(value):
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def invoice_snapshot(sale) -> SimpleNamespace:
+    """
+    Detach the fields the invoice prints from the ORM session. The result
+    is picklable, so rendering can run in a worker process.
+    """
+    return SimpleNamespace(
+        id=sale.id,
+        created_at=sale.created_at,
+        customer_name=sale.customer_name,
+        customer_phone=sale.customer_phone,
+        status=sale.status,
+        paid=sale.paid,
+        balance=sale.balance,
+        advance_amount=getattr(sale, "advance_amount", None),
+        advance_payment_mode=getattr(sale, "advance_payment_mode", None),
+        advance_payment_date=getattr(sale, "advance_payment_date", None),
+        balance_amount=getattr(sale, "balance_amount", None),
+        balance_payment_mode=getattr(sale, "balance_payment_mode", None),
+        balance_payment_date=getattr(sale, "balance_payment_date", None),
+        payment_status=getattr(sale, "payment_status", None),
+        items=[
+            SimpleNamespace(
+                qty=si.qty,
+                price=si.price,
+                taxable_value=si.taxable_value,
+                gst_percent=si.gst_percent,
+                gst_amount=si.gst_amount,
+                item=SimpleNamespace(
+                    name=si.item.name if si.item else "",
+                    hsn_code=si.item.hsn_code if si.item else None,
+                ),
+            )
+            for si in sale.items
+        ],
+    )
+
+
+def invoice_fingerprint(sale) -> str:
+    """
+    Hash of everything printed on the invoice. Any change to the sale
+    (delivery, return, payment) yields a new hash and thus a new PDF.
+    Accepts a Sale or an invoice_snapshot().
+    """
+    if not isinstance(sale, SimpleNamespace):
+        sale = invoice_snapshot(sale)
+
+    state = {
+        "layout": INVOICE_LAYOUT_VERSION,
+        "clinic": [CLINIC_NAME, CLINIC_ADDRESS, CLINIC_PHONE, CLINIC_GSTIN],
+        "id": sale.id,
+        "created_at": _fmt(sale.created_at),
+        "customer": [sale.customer_name, sale.customer_phone],
+        "status": sale.status,
+        "paid": _fmt(sale.paid),
+        "balance": _fmt(sale.balance),
+        "advance": [
+            _fmt(sale.advance_amount),
+            sale.advance_payment_mode,
+            _fmt(sale.advance_payment_date),
+        ],
+        "balance_payment": [
+            _fmt(sale.balance_amount),
+            sale.balance_payment_mode,
+            _fmt(sale.balance_payment_date),
+        ],
+        "payment_status": sale.payment_status,
+        "items": [
+            [
+                si.item.name,
+                si.item.hsn_code,
+                si.qty,
+                _fmt(si.price),
+                _fmt(si.taxable_value),
+                _fmt(si.gst_percent),
+                _fmt(si.gst_amount),
+            ]
+            for si in sale.items
+        ],
+    }
+
+    raw = json.dumps(state, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# ================= WORKER POOLS =================
+
+# "render" serves single invoices; "export" serves bulk exports, so a
+# month-end export never queues ahead of a counter reprint
+_POOL_SIZES = {
+    "render": INVOICE_RENDER_WORKERS,
+    "export": INVOICE_EXPORT_WORKERS,
+}
+_pools = {}
+_pool_lock = threading.Lock()
+
+
+def _get_pool(name: str = "render"):
+    workers = _POOL_SIZES[name]
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if name not in _pools:
+            # spawn, not fork: the server process already runs threads
+            # (request threadpool, scheduler, event listener) and forking
+            # it can copy held locks into the child
+            _pools[name] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pools[name]
+
+
+def shutdown_render_pool() -> None:
+    with _pool_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+def _render_bytes(snapshot) -> bytes:
+    buffer = BytesIO()
+    _render_invoice(snapshot, buffer)
+    return buffer.getvalue()
+
+
+def render_invoice_pdf_bytes(sale) -> bytes:
+    """
+    Render the invoice fully in memory. The ReportLab work runs in the
+    worker process pool (inline when INVOICE_RENDER_WORKERS is 0).
+    """
+    snapshot = sale if isinstance(sale, SimpleNamespace) else invoice_snapshot(sale)
+
+    pool = _get_pool()
+    if pool is None:
+        return _render_bytes(snapshot)
+
+    return pool.submit(_render_bytes, snapshot).result()
+
+
+def render_invoice_batch(snapshots):
+    """
+    Render a batch of invoice snapshots on the export pool (one worker
+    per core by default), yielding PDF bytes in input order.
+    """
+    pool = _get_pool("export")
+    if pool is None:
+        return map(_render_bytes, snapshots)
+
+    return pool.map(_render_bytes, snapshots)
+
+
+def _cached_path(sale_id: int, fingerprint: str) -> str:
+    return os.path.join(PDF_DIR, f"invoice_{sale_id}_{fingerprint[:16]}.pdf")
+
+
+def _prune_cache(keep: str) -> None:
+    """
+    Drop least recently used invoices once the directory exceeds
+    INVOICE_CACHE_MAX_FILES or INVOICE_CACHE_MAX_BYTES.
+    """
+    entries = []
+    for path in glob.glob(os.path.join(PDF_DIR, "invoice_*.pdf")):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+
+    entries.sort()
+    total_bytes = sum(size for _, size, _ in entries)
+    count = len(entries)
+
+    for _, size, path in entries:
+        if count <= INVOICE_CACHE_MAX_FILES and total_bytes <= INVOICE_CACHE_MAX_BYTES:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        count -= 1
+        total_bytes -= size
+
+
+def generate_invoice_pdf(sale, fingerprint: str | None = None):
+    """
+    Return the path of the invoice PDF, rendering it only when no file
+    exists for the sale's current fingerprint.
+    """
+    fingerprint = fingerprint or invoice_fingerprint(sale)
+    file_path = _cached_path(sale.id, fingerprint)
+
+    if os.path.exists(file_path):
+        # mtime doubles as the LRU clock
+        os.utime(file_path, None)
+        return file_path
+
+    pdf_bytes = render_invoice_pdf_bytes(sale)
+
+    tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as fh:
+            fh.write(pdf_bytes)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    # older renders of this sale are stale now
+    for stale in glob.glob(os.path.join(PDF_DIR, f"invoice_{sale.id}_*.pdf")):
+        if stale != file_path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+    _prune_cache(keep=file_path)
+
+    return file_path
 
-def generate_invoice_pdf(sale):
 
-    file_path = os.path.join(PDF_DIR, f"invoice_{sale.id}.pdf")
+# ================= RENDER =================
 
-    c = canvas.Canvas(file_path, pagesize=A4)
+def _render_invoice(sale, target):
+
+    c = canvas.Canvas(target, pagesize=A4)
 
     width, height = A4
 
@@ -207,5 +459,3 @@ def generate_invoice_pdf(sale):
     c.drawString(30, y, "Authorized Signature")
 
     c.save()
-
-    return file_path
@@ -0,0 +1,70 @@
+import csv
+import io
+
+
+def _clean(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def _iter_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        for row_no, row in enumerate(reader, start=2):
+            yield row_no, {(k or "").strip().lower(): _clean(v) for k, v in row.items()}
+    finally:
+        text.detach()
+
+
+def _iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires the openpyxl package")
+
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+        keys = [str(h or "").strip().lower() for h in header]
+
+        for row_no, values in enumerate(rows, start=2):
+            if all(v is None for v in values):
+                continue
+            yield row_no, {k: _clean(v) for k, v in zip(keys, values) if k}
+    finally:
+        wb.close()
+
+
+def iter_import_rows(filename: str, fileobj):
+    """
+    Stream (row_number, {column: value}) pairs from an uploaded CSV or
+    XLSX file. Headers are matched case-insensitively; blank cells
+    become None. Row numbers match the spreadsheet (header is row 1).
+    """
+    name = (filename or "").lower()
+
+    if name.endswith(".xlsx"):
+        return _iter_xlsx(fileobj)
+    if name.endswith(".csv") or not name:
+        return _iter_csv(fileobj)
+
+    raise ValueError("Unsupported file type; upload a .csv or .xlsx file")
+
+
+def chunked(iterable, size: int):
+    chunk = []
+    for entry in iterable:
+        chunk.append(entry)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
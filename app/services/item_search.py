@@ -0,0 +1,118 @@
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.config import ITEM_SEARCH_INDEX_TTL
+from app.models.all_models import Item
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ItemSearchIndex:
+    """
+    In-process trigram index over item name / brand / model / barcode,
+    for deployments whose PostgreSQL has no pg_trgm extension.
+
+    Only ids are ranked here; callers load the rows by primary key so
+    stock and prices are always fresh. The index is rebuilt after
+    ITEM_SEARCH_INDEX_TTL seconds to pick up edits from other workers,
+    and patched in place for edits made by this one.
+    """
+
+    def __init__(self, ttl: int):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._docs = {}
+        self._grams = {}
+
+    # ---------- build / patch ----------
+    def _reset(self):
+        self._docs = {}
+        self._grams = {}
+
+    def _add(self, item_id, name, brand, model, barcode):
+        fields = [(f or "").lower() for f in (name, brand, model, barcode)]
+        self._docs[item_id] = (fields, (barcode or "").lower())
+        for field in fields:
+            for gram in _trigrams(field):
+                self._grams.setdefault(gram, set()).add(item_id)
+
+    def _remove(self, item_id):
+        doc = self._docs.pop(item_id, None)
+        if not doc:
+            return
+        for field in doc[0]:
+            for gram in _trigrams(field):
+                ids = self._grams.get(gram)
+                if ids:
+                    ids.discard(item_id)
+
+    def _ensure_built(self, db: Session):
+        fresh = self._built_at and time.monotonic() - self._built_at < self._ttl
+        if fresh:
+            return
+
+        rows = db.query(Item.id, Item.name, Item.brand, Item.model, Item.barcode).all()
+        self._reset()
+        for row in rows:
+            self._add(row.id, row.name, row.brand, row.model, row.barcode)
+        self._built_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Force a full rebuild on the next search (after bulk writes)."""
+        with self._lock:
+            self._built_at = None
+
+    def upsert(self, item) -> None:
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._remove(item.id)
+            self._add(item.id, item.name, item.brand, item.model, item.barcode)
+
+    def remove(self, item_id: int) -> None:
+        with self._lock:
+            if self._built_at is not None:
+                self._remove(item_id)
+
+    # ---------- query ----------
+    def search(self, db: Session, query: str, limit: int = 20):
+        """
+        Ranked item ids: exact barcode, then prefix, then substring.
+        """
+        q = query.strip().lower()
+        if not q:
+            return []
+
+        with self._lock:
+            self._ensure_built(db)
+
+            grams = _trigrams(q)
+            if grams:
+                sets = sorted((self._grams.get(g, set()) for g in grams), key=len)
+                candidates = set.intersection(*sets) if sets[0] else set()
+            else:
+                candidates = self._docs.keys()
+
+            ranked = []
+            for item_id in candidates:
+                fields, barcode = self._docs[item_id]
+                if barcode == q:
+                    rank = 0
+                elif any(f.startswith(q) for f in fields):
+                    rank = 1
+                elif any(q in f for f in fields):
+                    rank = 2
+                else:
+                    continue
+                ranked.append((rank, len(fields[0]), fields[0], item_id))
+
+        ranked.sort()
+        return [item_id for *_, item_id in ranked[:limit]]
+
+
+item_search_index = ItemSearchIndex(ITEM_SEARCH_INDEX_TTL)
@@ -0,0 +1,152 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import cast, Date, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import LENS_STATS_WINDOW_DAYS
+from app.models.all_models import LensOrder, LensOrderStatusLog, Supplier, SupplierLensStats
+
+
+# =========================================================
+# REFRESH
+# =========================================================
+def _completed_stats(db: Session, since: datetime):
+    """
+    Turnaround per supplier for orders that first became READY after
+    `since`: time from the ORDERED log entry (or order creation) to the
+    first READY entry, in days.
+    """
+    per_order = (
+        select(
+            LensOrderStatusLog.lens_order_id,
+            func.min(LensOrderStatusLog.changed_at)
+            .filter(LensOrderStatusLog.status == "ORDERED")
+            .label("ordered_at"),
+            func.min(LensOrderStatusLog.changed_at)
+            .filter(LensOrderStatusLog.status == "READY")
+            .label("ready_at"),
+        )
+        .group_by(LensOrderStatusLog.lens_order_id)
+        .subquery("per_order")
+    )
+
+    started = func.coalesce(per_order.c.ordered_at, LensOrder.created_at)
+    days = func.extract("epoch", per_order.c.ready_at - started) / 86400
+    ready_day = cast(per_order.c.ready_at, Date)
+
+    return (
+        db.query(
+            LensOrder.supplier_id,
+            func.count().label("completed_count"),
+            func.avg(days).label("avg_days"),
+            func.percentile_cont(0.9).within_group(days).label("p90_days"),
+            func.count().filter(ready_day <= LensOrder.expected_date).label("on_time"),
+            func.count().filter(ready_day > LensOrder.expected_date).label("late"),
+        )
+        .join(per_order, per_order.c.lens_order_id == LensOrder.id)
+        .filter(per_order.c.ready_at >= since)
+        .filter(LensOrder.supplier_id.isnot(None))
+        .group_by(LensOrder.supplier_id)
+        .all()
+    )
+
+
+def _open_stats(db: Session, today: date):
+    return (
+        db.query(
+            LensOrder.supplier_id,
+            func.count().label("open_count"),
+            func.count().filter(LensOrder.expected_date < today).label("overdue_count"),
+        )
+        .filter(LensOrder.status != "DELIVERED")
+        .filter(LensOrder.supplier_id.isnot(None))
+        .group_by(LensOrder.supplier_id)
+        .all()
+    )
+
+
+def refresh_supplier_lens_stats(db: Session, window_days: int = LENS_STATS_WINDOW_DAYS) -> int:
+    """
+    Recompute supplier_lens_stats from the status log and open orders,
+    replacing every row in one transaction. Returns the supplier count.
+    """
+    today = date.today()
+    since = datetime.combine(today - timedelta(days=window_days), datetime.min.time())
+
+    def blank():
+        return {
+            "completed_count": 0,
+            "avg_turnaround_days": None,
+            "p90_turnaround_days": None,
+            "on_time_count": 0,
+            "late_count": 0,
+            "open_count": 0,
+            "overdue_count": 0,
+        }
+
+    rows = {}
+    for r in _completed_stats(db, since):
+        rows.setdefault(r.supplier_id, blank()).update(
+            completed_count=r.completed_count,
+            avg_turnaround_days=round(float(r.avg_days), 2) if r.avg_days is not None else None,
+            p90_turnaround_days=round(float(r.p90_days), 2) if r.p90_days is not None else None,
+            on_time_count=r.on_time,
+            late_count=r.late,
+        )
+    for r in _open_stats(db, today):
+        rows.setdefault(r.supplier_id, blank()).update(
+            open_count=r.open_count,
+            overdue_count=r.overdue_count,
+        )
+
+    db.execute(delete(SupplierLensStats))
+    if rows:
+        db.execute(
+            insert(SupplierLensStats),
+            [{"supplier_id": sid, **values} for sid, values in rows.items()],
+        )
+    db.commit()
+    return len(rows)
+
+
+def refresh_job() -> None:
+    """Scheduler entry point."""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        refresh_supplier_lens_stats(db)
+    finally:
+        db.close()
+
+
+# =========================================================
+# READ
+# =========================================================
+def list_supplier_lens_stats(db: Session):
+    rows = (
+        db.query(SupplierLensStats, Supplier.name)
+        .join(Supplier, Supplier.id == SupplierLensStats.supplier_id)
+        .order_by(Supplier.name)
+        .all()
+    )
+
+    return [
+        {
+            "supplier_id": s.supplier_id,
+            "supplier": name,
+            "completed_count": s.completed_count,
+            "avg_turnaround_days": (
+                float(s.avg_turnaround_days) if s.avg_turnaround_days is not None else None
+            ),
+            "p90_turnaround_days": (
+                float(s.p90_turnaround_days) if s.p90_turnaround_days is not None else None
+            ),
+            "on_time_count": s.on_time_count,
+            "late_count": s.late_count,
+            "open_count": s.open_count,
+            "overdue_count": s.overdue_count,
+            "computed_at": s.computed_at.isoformat() if s.computed_at else None,
+        }
+        for s, name in rows
+    ]
@@ -1,6 +1,14 @@
 from typing import Any, Dict, List
 
-from app.models.all_models import Sale
+from app.models.all_models import Payment, Sale, SaleItem
+
+
+def _columns(obj, model) -> Dict[str, Any]:
+    """
+    Column values only. Eager-loaded relationships (e.g. SaleItem.item,
+    with its cost prices and supplier details) stay out of the response.
+    """
+    return {c.key: getattr(obj, c.key) for c in model.__mapper__.column_attrs}
 
 
 def build_sale_detail_response(sale: Sale) -> Dict[str, Any]:
@@ -40,14 +48,15 @@ def build_sale_detail_response(sale: Sale) -> Dict[str, Any]:
             "sgst": total_sgst,
             "total_gst": total_gst,
         },
-        "items": sale.items,
-        "payments": sale.payments,
+        "items": [_columns(i, SaleItem) for i in sale.items],
+        "payments": [_columns(p, Payment) for p in sale.payments],
     }
 
 
-def build_sales_list_response(sales: List[Sale]) -> List[Dict[str, Any]]:
+def build_sales_list_response(sales: List[Any]) -> List[Dict[str, Any]]:
     """
     Compact list representation for /sales listing endpoint.
+    Accepts Sale objects or column rows with the same attribute names.
     """
     return [
         {
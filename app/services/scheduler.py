@@ -0,0 +1,62 @@
+import logging
+import threading
+import time
+
+from app.core.config import SCHEDULER_ENABLED
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicScheduler:
+    """
+    Runs registered jobs at fixed intervals on one daemon thread.
+
+    Jobs run one after another and open their own sessions; a failing
+    job is logged and retried at its next interval. Each job first runs
+    shortly after start().
+    """
+
+    def __init__(self, enabled: bool = True):
+        self._enabled = enabled
+        self._jobs = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def every(self, seconds: int, fn, name: str | None = None) -> None:
+        self._jobs.append(
+            {"name": name or fn.__name__, "fn": fn, "interval": seconds, "due": 0.0}
+        )
+
+    # ---------- lifecycle ----------
+    def start(self) -> None:
+        if not self._enabled or not self._jobs or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            for job in self._jobs:
+                if self._stop.is_set():
+                    return
+                if time.monotonic() < job["due"]:
+                    continue
+                try:
+                    job["fn"]()
+                except Exception:
+                    logger.exception("Scheduled job %s failed", job["name"])
+                job["due"] = time.monotonic() + job["interval"]
+
+            next_due = min(job["due"] for job in self._jobs)
+            self._stop.wait(max(1.0, next_due - time.monotonic()))
+
+
+scheduler = PeriodicScheduler(SCHEDULER_ENABLED)
@@ -0,0 +1,289 @@
+import argparse
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import TIMESTAMP, Date, Integer, case, column, func, insert, literal, select, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.all_models import Item, StockMovement, StockSnapshot
+from app.services.events import queue_event
+
+
+# movement_type values written to stock_movements
+SALE = "SALE"
+RETURN = "RETURN"
+PURCHASE = "PURCHASE"
+ADJUSTMENT = "ADJUSTMENT"
+OPENING = "OPENING"
+
+
+class InsufficientStock(Exception):
+    def __init__(self, item_ids):
+        self.item_ids = item_ids
+        super().__init__(f"Insufficient stock for items {sorted(item_ids)}")
+
+
+# =========================================================
+# WRITE PATH
+# =========================================================
+def record_movements(db: Session, movement_type: str, reference_id, changes) -> None:
+    """
+    Append ledger rows for stock changes that were already applied to
+    items.stock_qty (e.g. opening stock on insert). One executemany.
+    """
+    rows = [
+        {
+            "item_id": item_id,
+            "change_qty": qty,
+            "movement_type": movement_type,
+            "reference_id": reference_id,
+        }
+        for item_id, qty in changes.items()
+        if qty
+    ]
+    if rows:
+        db.execute(insert(StockMovement), rows)
+
+
+def apply_stock_changes(
+    db: Session,
+    changes,
+    movement_type: str,
+    reference_id=None,
+    require_available: bool = False,
+):
+    """
+    The single entry point for changing stock.
+
+    `changes` maps item_id -> signed quantity. All items are updated with
+    one UPDATE ... FROM (VALUES ...) and the matching movements are
+    appended to the ledger. With require_available, decrements only
+    apply while stock_qty stays >= 0; InsufficientStock is raised
+    otherwise (the caller rolls back). Unknown item ids raise ValueError.
+    Does not commit.
+    Returns {item_id: new stock_qty}.
+    """
+    changes = {item_id: qty for item_id, qty in changes.items() if qty}
+    if not changes:
+        return {}
+
+    deltas = values(
+        column("item_id", Integer),
+        column("qty", Integer),
+        name="deltas",
+    ).data(sorted(changes.items()))
+
+    stmt = (
+        update(Item)
+        .where(Item.id == deltas.c.item_id)
+        .values(stock_qty=func.coalesce(Item.stock_qty, 0) + deltas.c.qty)
+        .returning(Item.id, Item.stock_qty)
+        .execution_options(synchronize_session=False)
+    )
+    if require_available:
+        stmt = stmt.where(func.coalesce(Item.stock_qty, 0) + deltas.c.qty >= 0)
+
+    updated = {row.id: row.stock_qty for row in db.execute(stmt)}
+
+    missing = set(changes) - set(updated)
+    if missing:
+        if require_available:
+            raise InsufficientStock(missing)
+        raise ValueError(f"Item not found: {', '.join(map(str, sorted(missing)))}")
+
+    record_movements(db, movement_type, reference_id, changes)
+
+    queue_event(
+        db, "stock", "stock.changed",
+        items=[{"item_id": i, "stock_qty": q} for i, q in updated.items()],
+    )
+
+    return updated
+
+
+# =========================================================
+# SNAPSHOTS
+# =========================================================
+def _end_of(day: date) -> datetime:
+    return datetime.combine(day + timedelta(days=1), time.min)
+
+
+def take_snapshot(db: Session, as_of: date | None = None) -> int:
+    """
+    Store every item's balance at the end of `as_of` (default yesterday).
+
+    The balance is the current stock_qty minus the movements recorded
+    after the cutoff, read in one statement so it is consistent with the
+    ledger. Re-running for the same day overwrites it. Commits.
+    """
+    as_of = as_of or date.today() - timedelta(days=1)
+    cutoff = _end_of(as_of)
+
+    after = (
+        select(
+            StockMovement.item_id,
+            func.sum(StockMovement.change_qty).label("qty"),
+        )
+        .where(StockMovement.created_at >= cutoff)
+        .group_by(StockMovement.item_id)
+        .subquery("after")
+    )
+
+    source = (
+        select(
+            Item.id,
+            literal(as_of, Date),
+            literal(cutoff, TIMESTAMP),
+            func.coalesce(Item.stock_qty, 0) - func.coalesce(after.c.qty, 0),
+            func.coalesce(Item.cost_price, Item.purchase_price),
+        )
+        .outerjoin(after, after.c.item_id == Item.id)
+    )
+
+    stmt = pg_insert(StockSnapshot).from_select(
+        ["item_id", "snapshot_date", "cutoff_at", "qty", "cost_price"],
+        source,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StockSnapshot.item_id, StockSnapshot.snapshot_date],
+        set_={
+            "cutoff_at": stmt.excluded.cutoff_at,
+            "qty": stmt.excluded.qty,
+            "cost_price": stmt.excluded.cost_price,
+        },
+    )
+
+    written = db.execute(stmt).rowcount
+    db.commit()
+    return written
+
+
+def snapshot_job() -> None:
+    """
+    Scheduler entry point: take yesterday's snapshot once it is missing.
+    """
+    from app.core.database import SessionLocal
+
+    yesterday = date.today() - timedelta(days=1)
+    db = SessionLocal()
+    try:
+        taken = (
+            db.query(StockSnapshot.id)
+            .filter(StockSnapshot.snapshot_date == yesterday)
+            .first()
+        )
+        if not taken:
+            take_snapshot(db, yesterday)
+    finally:
+        db.close()
+
+
+# =========================================================
+# READ PATH
+# =========================================================
+def stock_as_of(db: Session, as_of: date, item_ids=None):
+    """
+    Per-item balance and valuation at the end of `as_of`.
+
+    Each item starts from its latest snapshot on or before that day and
+    adds the short movement tail up to the cutoff. Items without a
+    snapshot are walked back from the live balance instead.
+    """
+    end = _end_of(as_of)
+
+    snap = (
+        select(
+            StockSnapshot.item_id,
+            StockSnapshot.cutoff_at,
+            StockSnapshot.qty,
+        )
+        .where(StockSnapshot.snapshot_date <= as_of)
+        .distinct(StockSnapshot.item_id)
+        .order_by(StockSnapshot.item_id, StockSnapshot.snapshot_date.desc())
+        .subquery("snap")
+    )
+
+    tail = (
+        select(
+            StockMovement.item_id,
+            func.sum(StockMovement.change_qty).label("qty"),
+        )
+        .join(snap, snap.c.item_id == StockMovement.item_id)
+        .where(StockMovement.created_at >= snap.c.cutoff_at)
+        .where(StockMovement.created_at < end)
+        .group_by(StockMovement.item_id)
+        .subquery("tail")
+    )
+
+    after = (
+        select(
+            StockMovement.item_id,
+            func.sum(StockMovement.change_qty).label("qty"),
+        )
+        .where(StockMovement.created_at >= end)
+        .group_by(StockMovement.item_id)
+        .subquery("after")
+    )
+
+    qty = case(
+        (snap.c.item_id.isnot(None), snap.c.qty + func.coalesce(tail.c.qty, 0)),
+        else_=func.coalesce(Item.stock_qty, 0) - func.coalesce(after.c.qty, 0),
+    )
+
+    query = (
+        db.query(
+            Item.id,
+            Item.name,
+            func.coalesce(Item.cost_price, Item.purchase_price).label("cost_price"),
+            qty.label("qty"),
+        )
+        .outerjoin(snap, snap.c.item_id == Item.id)
+        .outerjoin(tail, tail.c.item_id == Item.id)
+        .outerjoin(after, after.c.item_id == Item.id)
+        .order_by(Item.id)
+    )
+    if item_ids:
+        query = query.filter(Item.id.in_(item_ids))
+
+    rows = query.all()
+
+    items = [
+        {
+            "item_id": r.id,
+            "name": r.name,
+            "qty": int(r.qty or 0),
+            "cost_price": float(r.cost_price or 0),
+            "value": float(r.cost_price or 0) * int(r.qty or 0),
+        }
+        for r in rows
+    ]
+
+    return {
+        "as_of": as_of.isoformat(),
+        "total_qty": sum(i["qty"] for i in items),
+        "total_value": round(sum(i["value"] for i in items), 2),
+        "items": items,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Stock ledger maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    snap = sub.add_parser("snapshot", help="Snapshot per-item balances")
+    snap.add_argument("--date", dest="as_of", type=date.fromisoformat)
+
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        written = take_snapshot(db, args.as_of)
+        print(f"stock_snapshots: {written} item(s) written")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import argparse
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from app.services.item_import import iter_import_rows
+
+
+INVOICE_SUFFIXES = (".json", ".csv", ".xlsx")
+
+# spreadsheet header -> invoice field (headers are lower-cased)
+COLUMN_ALIASES = {
+    "invoice_no": ("invoice_no", "invoice", "bill_no"),
+    "date": ("invoice_date", "date", "bill_date"),
+    "supplier_gstin": ("supplier_gstin", "gstin"),
+    "barcode": ("barcode",),
+    "hsn_code": ("hsn_code", "hsn"),
+    "model": ("model",),
+    "name": ("name", "description", "item"),
+    "qty": ("qty", "quantity"),
+    "price": ("price", "rate", "unit_price"),
+    "gst_percent": ("gst_percent", "gst", "gst_rate"),
+}
+
+
+def _pick(row: dict, field: str):
+    for key in COLUMN_ALIASES[field]:
+        value = row.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        # barcodes / HSN codes read from XLSX as numbers
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def _parse_date(value):
+    if value is None or isinstance(value, date):
+        return value.date() if isinstance(value, datetime) else value
+    value = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value}")
+
+
+def _new_invoice(source: str, invoice_no, invoice_date, gstin) -> dict:
+    return {
+        "source": source,
+        "invoice_no": _text(invoice_no),
+        "date": invoice_date,
+        "supplier_gstin": _text(gstin),
+        "lines": [],
+        "errors": [],
+    }
+
+
+def _add_line(invoice: dict, line_no, barcode, hsn_code, model, name, qty, price, gst) -> None:
+    """
+    Normalise one bill line onto `invoice`; bad values are recorded in
+    invoice["errors"] so the whole invoice is rejected with a reason.
+    """
+    try:
+        qty = Decimal(str(qty))
+        price = Decimal(str(price))
+        gst = Decimal(str(gst)) if gst is not None else Decimal(0)
+    except (InvalidOperation, ValueError):
+        invoice["errors"].append(f"line {line_no}: qty, price and gst must be numbers")
+        return
+
+    if qty <= 0 or qty != qty.to_integral_value():
+        invoice["errors"].append(f"line {line_no}: qty must be a positive whole number")
+        return
+    if price < 0:
+        invoice["errors"].append(f"line {line_no}: price cannot be negative")
+        return
+
+    invoice["lines"].append(
+        {
+            "line": line_no,
+            "barcode": _text(barcode),
+            "hsn_code": _text(hsn_code),
+            "model": _text(model),
+            "name": _text(name),
+            "qty": int(qty),
+            "price": price,
+            "gst_percent": gst,
+        }
+    )
+
+
+# =========================================================
+# CSV / XLSX BILLS
+# =========================================================
+def _iter_tabular(source: str, rows, default_no: str):
+    """
+    One invoice per invoice_no in the sheet, wherever its rows sit; a
+    sheet without that column is a single invoice named after the file.
+    Invoices are yielded once the whole sheet has been read.
+    """
+    invoices = {}
+
+    for row_no, row in rows:
+        invoice_no = _text(_pick(row, "invoice_no")) or default_no
+
+        current = invoices.get(invoice_no)
+        if current is None:
+            try:
+                invoice_date = _parse_date(_pick(row, "date"))
+            except ValueError as e:
+                invoice_date = None
+                error = f"row {row_no}: {e}"
+            else:
+                error = None
+            current = _new_invoice(source, invoice_no, invoice_date, _pick(row, "supplier_gstin"))
+            if error:
+                current["errors"].append(error)
+            invoices[invoice_no] = current
+
+        qty, price = _pick(row, "qty"), _pick(row, "price")
+        if qty is None or price is None:
+            current["errors"].append(f"row {row_no}: qty and price are required")
+            continue
+
+        _add_line(
+            current, row_no,
+            _pick(row, "barcode"), _pick(row, "hsn_code"), _pick(row, "model"),
+            _pick(row, "name"), qty, price, _pick(row, "gst_percent"),
+        )
+
+    yield from invoices.values()
+
+
+# =========================================================
+# GST E-INVOICE JSON
+# =========================================================
+def _einvoice_parts(doc):
+    """
+    (DocDtls, SellerDtls, ItemList) of one document, or None when it is
+    not shaped like an e-invoice.
+    """
+    if not isinstance(doc, dict):
+        return None
+    details = doc.get("DocDtls") or {}
+    seller = doc.get("SellerDtls") or {}
+    lines = doc.get("ItemList") or []
+    if not (isinstance(details, dict) and isinstance(seller, dict) and isinstance(lines, list)):
+        return None
+    return details, seller, lines
+
+
+def _iter_einvoice(source: str, fileobj):
+    """
+    GST e-invoice (INV-01) documents: a single object or a list of them.
+    Lines carry no model, so the product description stands in for it.
+    """
+    docs = json.load(fileobj)
+    if not isinstance(docs, list):
+        docs = [docs]
+
+    for doc_no, doc in enumerate(docs, start=1):
+        parts = _einvoice_parts(doc)
+        if parts is None:
+            invoice = _new_invoice(source, None, None, None)
+            invoice["errors"].append(f"document {doc_no}: not an e-invoice object")
+            yield invoice
+            continue
+        details, seller, lines = parts
+
+        try:
+            invoice_date = _parse_date(details.get("Dt"))
+        except ValueError as e:
+            invoice_date = None
+            date_error = str(e)
+        else:
+            date_error = None
+
+        invoice = _new_invoice(source, details.get("No"), invoice_date, seller.get("Gstin"))
+        if date_error:
+            invoice["errors"].append(date_error)
+
+        for pos, line in enumerate(lines, start=1):
+            if not isinstance(line, dict):
+                invoice["errors"].append(f"line {pos}: expected an item object")
+                continue
+            _add_line(
+                invoice, line.get("SlNo") or pos,
+                line.get("Barcde"), line.get("HsnCd"), None,
+                line.get("PrdDesc"), line.get("Qty"), line.get("UnitPrice"),
+                line.get("GstRt"),
+            )
+
+        yield invoice
+
+
+def iter_supplier_invoices(filename: str, fileobj):
+    """
+    Stream normalised invoices from one supplier file (.json e-invoice,
+    .csv or .xlsx bill). A file that cannot be read at all yields a
+    single invoice carrying the error, so a batch run keeps going.
+    """
+    name = (filename or "").lower()
+    stem = Path(filename or "invoice").stem
+
+    try:
+        if name.endswith(".json"):
+            yield from _iter_einvoice(filename, fileobj)
+        else:
+            yield from _iter_tabular(filename, iter_import_rows(filename, fileobj), stem)
+    except (ValueError, UnicodeDecodeError) as e:
+        invoice = _new_invoice(filename, None, None, None)
+        invoice["errors"].append(str(e))
+        yield invoice
+
+
+def iter_invoice_folder(folder):
+    """
+    Invoices from every supported file in `folder`, one file open at a
+    time, in name order.
+    """
+    for path in sorted(Path(folder).iterdir()):
+        if path.suffix.lower() not in INVOICE_SUFFIXES:
+            continue
+        with path.open("rb") as fileobj:
+            yield from iter_supplier_invoices(path.name, fileobj)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Import supplier invoices as purchases")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Import every invoice file in a folder")
+    ingest.add_argument("folder")
+    ingest.add_argument(
+        "--supplier-id", type=int,
+        help="Supplier for invoices whose GSTIN does not match one on file",
+    )
+
+    args = parser.parse_args(argv)
+
+    from app.core.database import SessionLocal
+    from app.crud.purchase import import_supplier_invoices
+
+    db = SessionLocal()
+    try:
+        report = import_supplier_invoices(db, iter_invoice_folder(args.folder), args.supplier_id)
+    finally:
+        db.close()
+
+    print(
+        f"invoices: {report['processed']} read, {report['created']} created, "
+        f"{report['duplicates']} duplicate, {report['failed']} failed"
+    )
+    for err in report["errors"]:
+        print(f"  {err['source']} {err['invoice_no'] or '-'}: {err['error']}")
+
+
+if __name__ == "__main__":
+    main()
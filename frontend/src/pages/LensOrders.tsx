@@ -45,7 +45,7 @@ export default function LensOrders() {
   // LOAD DATA
   const load = () => {
 
-    axios.get(`${API}/lens/`, { headers })
+    axios.get(`${API}/lens/`, { headers, params: { active: true } })
       .then(res => setOrders(res.data))
       .catch(err => console.error("Lens load error:", err))
 
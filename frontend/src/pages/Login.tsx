@@ -8,8 +8,10 @@ export default function Login() {
 
  const login = async () => {
 
+  // form body, so credentials stay out of URLs and access logs
   const res = await axios.post(
-    `http://192.168.10.216:9200/auth/login?username=${username}&password=${password}`
+    "http://192.168.10.216:9200/auth/login",
+    new URLSearchParams({ username, password })
   )
 
   localStorage.setItem("token", res.data.access_token)
@@ -0,0 +1,82 @@
+"""
+Catalogue import against a scratch PostgreSQL database (the upsert uses
+ON CONFLICT and partial indexes). Set TEST_DATABASE_URL to run; every
+table is created at the start and dropped at the end.
+"""
+import os
+from decimal import Decimal
+
+import pytest
+
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+
+@pytest.fixture
+def db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.database import Base
+    import app.models.all_models  # noqa: F401  (registers the tables)
+
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def test_partial_reimport_keeps_columns_not_in_sheet(db):
+    from app.crud.item import import_items
+    from app.models.all_models import Category, Item
+
+    category = Category(name="Frames")
+    db.add(category)
+    db.commit()
+
+    full = {
+        "barcode": "8901234",
+        "name": "Aviator",
+        "category_id": category.id,
+        "brand": "Ray-Ban",
+        "model": "RB3025",
+        "hsn_code": "9004",
+        "supplier_name": "Lux Optics",
+        "cost_price": "1500",
+        "selling_price": "4200",
+        "gst_percent": "12",
+        "stock_qty": 5,
+    }
+    report = import_items(db, [(2, full)])
+    assert report["inserted"] == 1, report["errors"]
+
+    # a supplier price list: new cost, blank brand, nothing else
+    partial = {
+        "barcode": "8901234",
+        "name": "Aviator",
+        "category_id": category.id,
+        "brand": None,
+        "cost_price": "1650",
+    }
+    report = import_items(db, [(2, partial)])
+    assert report["updated"] == 1, report["errors"]
+
+    db.expire_all()
+    item = db.query(Item).filter(Item.barcode == "8901234").one()
+    assert item.cost_price == Decimal("1650")
+    assert item.selling_price == Decimal("4200")
+    assert item.gst_percent == Decimal("12")
+    assert item.hsn_code == "9004"
+    assert item.brand == "Ray-Ban"
+    assert item.model == "RB3025"
+    assert item.supplier_name == "Lux Optics"
+    assert item.stock_qty == 5